@@ -0,0 +1,111 @@
+import json
+import zlib
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, insert
+
+from models import db, Application, Message, MessageArchive, User
+
+# Chat threads of closed applications move out of the message table into
+# zlib-compressed chunks of MessageArchive, oldest messages first. A thread
+# is only archived once it has gone quiet, so its archived messages are all
+# older than the ones still in the table and readers can page through the
+# table first and then the archive (see loaders.load_thread_page).
+
+CLOSED_STATUSES = ('approved', 'rejected')
+ARCHIVE_CHUNK = 200  # messages per archive row
+INACTIVE_DAYS = 30
+
+
+class ArchivedMessage:
+    """A message restored from the archive; reads like a Message in templates."""
+
+    archived = True
+
+    def __init__(self, data, application_id, sender, position):
+        self.id = data['id']
+        self.position = position  # (chunk id, index), the paging key
+        self.application_id = application_id
+        self.sender_id = data['sender_id']
+        self.sender = sender
+        self.content = data['content']
+        self.timestamp = datetime.fromisoformat(data['timestamp'])
+
+
+def encode(messages):
+    return zlib.compress(json.dumps([{
+        'id': message.id,
+        'sender_id': message.sender_id,
+        'content': message.content,
+        'timestamp': message.timestamp.isoformat(),
+    } for message in messages], ensure_ascii=False).encode('utf-8'))
+
+
+def decode(payload):
+    return json.loads(zlib.decompress(payload).decode('utf-8'))
+
+
+def archive_closed_threads(inactive_days=INACTIVE_DAYS, max_applications=100):
+    """Archive the threads of closed applications with no message for ``inactive_days``.
+
+    Each thread is archived and deleted from the message table in its own
+    transaction. Returns ``(applications, messages)`` archived.
+    """
+    cutoff = datetime.utcnow() - timedelta(days=inactive_days)
+    application_ids = [application_id for (application_id,) in db.session
+                       .query(Message.application_id)
+                       .join(Application, Application.id == Message.application_id)
+                       .filter(Application.status.in_(CLOSED_STATUSES))
+                       .group_by(Message.application_id)
+                       .having(func.max(Message.timestamp) < cutoff)
+                       .limit(max_applications)]
+    archived = 0
+    for application_id in application_ids:
+        messages = Message.query.filter_by(application_id=application_id).order_by(Message.id).all()
+        now = datetime.utcnow()
+        db.session.execute(insert(MessageArchive), [{
+            'application_id': application_id,
+            'first_message_id': chunk[0].id,
+            'last_message_id': chunk[-1].id,
+            'message_count': len(chunk),
+            'payload': encode(chunk),
+            'archived_at': now,
+        } for chunk in (messages[i:i + ARCHIVE_CHUNK] for i in range(0, len(messages), ARCHIVE_CHUNK))])
+        # By id, so a message sent meanwhile stays in the hot table
+        for i in range(0, len(messages), 1000):
+            (Message.query.filter(Message.id.in_([message.id for message in messages[i:i + 1000]]))
+             .delete(synchronize_session=False))
+        db.session.commit()
+        db.session.expunge_all()
+        archived += len(messages)
+    return len(application_ids), archived
+
+
+def load_archived(application_id, before=None, limit=50):
+    """Load up to ``limit`` archived messages of an application, newest first.
+
+    ``before`` is the ``position`` of the oldest archived message already
+    shown, or None to start from the newest one. Positions are (chunk id,
+    index in chunk) rather than message ids, which the database may reuse
+    once archived rows are gone from the message table.
+    """
+    chunk_id, position = before or (None, 0)
+    found = []
+    while len(found) < limit:
+        query = MessageArchive.query.filter_by(application_id=application_id)
+        if chunk_id is not None:
+            query = query.filter(MessageArchive.id <= chunk_id if position else MessageArchive.id < chunk_id)
+        chunk = query.order_by(MessageArchive.id.desc()).first()
+        if chunk is None:
+            break
+        data = decode(chunk.payload)
+        end = position if chunk.id == chunk_id else len(data)
+        for index in range(end - 1, max(end - (limit - len(found)), 0) - 1, -1):
+            found.append(((chunk.id, index), data[index]))
+        chunk_id, position = chunk.id, 0
+    if not found:
+        return []
+
+    senders = {user.id: user for user in User.query.filter(User.id.in_({item['sender_id'] for _, item in found}))}
+    return [ArchivedMessage(item, application_id, senders.get(item['sender_id']), position)
+            for position, item in found]
@@ -0,0 +1,170 @@
+"""Benchmark runner: latency percentiles and queries per request for the main routes.
+
+    python -m bench.run --rows 10000 --iterations 200
+    python -m bench.run --baseline bench/baseline.json          # exit 1 on regression
+    python -m bench.run --baseline bench/baseline.json --update-baseline
+    python -m bench.run --baseline bench/baseline.json --latency-baseline base_output.json
+
+Query counts don't depend on the machine, so the committed baseline pins
+them. Latency does; --latency-baseline compares it with a run of the base
+commit on the same machine instead (see .github/workflows/bench.yml).
+
+Without DATABASE_URL a fresh SQLite file is seeded for the run; point
+DATABASE_URL at a local MySQL to benchmark against it instead.
+"""
+import argparse
+import json
+import math
+import os
+import sys
+import tempfile
+import time
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    index = max(math.ceil(pct / 100.0 * len(ordered)) - 1, 0)
+    return ordered[index]
+
+
+def run(scenarios, iterations=100, warmup=10):
+    """Replay each scenario and return ``{name: stats}``."""
+    from sqlalchemy import event
+    from sqlalchemy.engine import Engine
+
+    from app import app
+    from .scenarios import Context
+
+    queries = [0]
+
+    def count_query(*args):
+        queries[0] += 1
+
+    event.listen(Engine, 'before_cursor_execute', count_query)
+    try:
+        ctx = Context(app)
+        results = {}
+        for name, scenario in scenarios.items():
+            uncached = getattr(scenario, 'uncached', False)
+            for i in range(warmup):
+                scenario(ctx, i)
+            latencies, counts = [], []
+            for i in range(warmup, warmup + iterations):
+                if uncached:
+                    ctx.clear_caches()
+                queries[0] = 0
+                started = time.perf_counter()
+                response = scenario(ctx, i)
+                latencies.append((time.perf_counter() - started) * 1000)
+                counts.append(queries[0])
+                if response.status_code >= 500:
+                    raise RuntimeError(f"{name} returned {response.status_code}")
+            results[name] = {
+                'n': iterations,
+                'p50_ms': round(percentile(latencies, 50), 3),
+                'p95_ms': round(percentile(latencies, 95), 3),
+                'p99_ms': round(percentile(latencies, 99), 3),
+                'mean_ms': round(sum(latencies) / len(latencies), 3),
+                'queries_mean': round(sum(counts) / len(counts), 2),
+                'queries_max': max(counts),
+            }
+        return results
+    finally:
+        event.remove(Engine, 'before_cursor_execute', count_query)
+
+
+def compare(results, baseline, tolerance, latency_baseline=None):
+    """Return a list of regressions of ``results`` against ``baseline``.
+
+    Query counts are deterministic and must not grow at all; latency may
+    grow by ``tolerance`` (0.5 = 50%) to absorb noise. Latency is checked
+    against ``latency_baseline`` when given, and scenarios it lacks are
+    left unchecked.
+    """
+    regressions = []
+    for name, expected in baseline.items():
+        actual = results.get(name)
+        if actual is None:
+            continue
+        if actual['queries_max'] > expected['queries_max']:
+            regressions.append(f"{name}: queries per request {actual['queries_max']} > baseline {expected['queries_max']}")
+    for name, expected in (latency_baseline if latency_baseline is not None else baseline).items():
+        actual = results.get(name)
+        if actual is None:
+            continue
+        limit = expected['p95_ms'] * (1 + tolerance)
+        if actual['p95_ms'] > limit:
+            regressions.append(f"{name}: p95 {actual['p95_ms']:.1f} ms > {limit:.1f} ms (baseline {expected['p95_ms']:.1f} ms)")
+    return regressions
+
+
+def print_report(results):
+    print(f"{'scenario':<26}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'queries':>9}")
+    for name, stats in results.items():
+        print(f"{name:<26}{stats['p50_ms']:>9.2f}{stats['p95_ms']:>9.2f}{stats['p99_ms']:>9.2f}{stats['queries_mean']:>9.1f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the Thozhil Bazaar routes.")
+    parser.add_argument("--rows", type=int, default=10000, help="rows to seed into a fresh database")
+    parser.add_argument("--iterations", type=int, default=100)
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--scenario", action="append", help="run only these scenarios")
+    parser.add_argument("--output", help="write results as JSON")
+    parser.add_argument("--baseline", help="baseline JSON to compare against")
+    parser.add_argument("--latency-baseline", help="results JSON, from the same machine, to compare latency against")
+    parser.add_argument("--tolerance", type=float, default=0.5, help="allowed p95 growth over the baseline")
+    parser.add_argument("--update-baseline", action="store_true", help="overwrite the baseline with this run")
+    args = parser.parse_args(argv)
+
+    fresh = 'DATABASE_URL' not in os.environ
+    if fresh:
+        workdir = tempfile.mkdtemp(prefix="tb-bench-")
+        os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    # User state in a cache of its own (a different URL), so uncached scenarios clear the pages alone
+    os.environ.setdefault('USER_STATE_CACHE_URL', "memory://?max_bytes=8388608")
+
+    from app import app
+    from models import db
+    from .scenarios import SCENARIOS
+    from .seed import seed
+
+    if fresh:
+        with app.app_context():
+            db.create_all()
+            print("seeded", seed(args.rows))
+
+    scenarios = {name: SCENARIOS[name] for name in (args.scenario or SCENARIOS)}
+    results = run(scenarios, args.iterations, args.warmup)
+    print_report(results)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        if args.update_baseline:
+            with open(args.baseline, 'w', encoding='utf-8') as f:
+                json.dump(results, f, indent=2)
+                f.write("\n")
+            print(f"baseline written to {args.baseline}")
+            return 0
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        latency_baseline = None
+        if args.latency_baseline:
+            with open(args.latency_baseline, encoding='utf-8') as f:
+                latency_baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance, latency_baseline)
+        if regressions:
+            print("PERFORMANCE REGRESSION", file=sys.stderr)
+            for regression in regressions:
+                print("  " + regression, file=sys.stderr)
+            return 1
+        print("no regressions against", args.baseline)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
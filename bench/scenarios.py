@@ -0,0 +1,132 @@
+"""Request scenarios replayed by the benchmark runner.
+
+Each scenario is ``fn(ctx, i)`` and issues exactly one measured request
+through a Flask test client. Scenarios marked ``@uncached`` start each
+request with empty page and count caches, so they measure the queries and
+rendering those caches would otherwise hide.
+"""
+import re
+from html import unescape
+
+from .seed import BENCH_PASSWORD
+
+EMPLOYER_MOBILE = "9000000001"
+EMPLOYEE_MOBILE = "8000000001"
+APPLICANT_MOBILE = "8000000002"  # has seeded applications, so a recommendation profile
+
+FILTERS = [
+    {'filter_title': 'electrician'},
+    {'filter_title': 'ஓட்டுநர்'},
+    {'filter_location': 'madurai'},
+    {'filter_location': 'சென்னை'},
+    {'filter_title': 'cook', 'filter_location': 'salem'},
+    {'filter_date': '2000-01-01'},
+    {'filter_location': 'madurai', 'filter_radius': '50'},
+]
+
+
+class Context:
+    """Logged-in clients and ids the scenarios need, prepared once before timing."""
+
+    def __init__(self, app):
+        from models import Application, Job, Message, User
+
+        self.app = app
+        self.employee = self.login(EMPLOYEE_MOBILE)
+        self.employer = self.login(EMPLOYER_MOBILE)
+        self.applicant = self.login(APPLICANT_MOBILE)
+
+        with app.app_context():
+            employer_id = User.query.filter_by(mobile=EMPLOYER_MOBILE).one().id
+            self.chats = [(application_id, 0) for (application_id,) in Application.query
+                          .with_entities(Application.id)
+                          .join(Job, Job.id == Application.job_id)
+                          .filter(Job.user_id == employer_id)
+                          .order_by(Application.id)
+                          .limit(50)]
+            last_ids = dict(Message.query.with_entities(Message.application_id, Message.id)
+                            .filter(Message.application_id.in_([chat[0] for chat in self.chats]))
+                            .order_by(Message.id))
+            self.chats = [(application_id, last_ids.get(application_id, 0)) for application_id, _ in self.chats]
+            self.job_ids = [job_id for (job_id,) in (Job.query.with_entities(Job.id)
+                                                     .filter(Job.status == 'open')
+                                                     .order_by(Job.id.desc())
+                                                     .limit(5000))]
+
+        first_page = self.employee.get('/job-listing').get_data(as_text=True)
+        match = re.search(r'href="([^"]*cursor=[^"]+)" class="page-link">', first_page)
+        self.next_page_url = unescape(match.group(1)) if match else '/job-listing'
+
+    def clear_caches(self):
+        from app import fragment_cache, job_counts
+
+        fragment_cache.clear()
+        job_counts.clear()
+
+    def login(self, mobile):
+        client = self.app.test_client()
+        response = client.post('/', data={'mobile': mobile, 'password': BENCH_PASSWORD})
+        if response.status_code != 302:
+            raise RuntimeError(f"Benchmark login failed for {mobile}")
+        return client
+
+
+def uncached(scenario):
+    scenario.uncached = True
+    return scenario
+
+
+def login(ctx, i):
+    return ctx.app.test_client().post('/', data={'mobile': EMPLOYEE_MOBILE, 'password': BENCH_PASSWORD})
+
+
+@uncached
+def job_listing(ctx, i):
+    return ctx.employee.get('/job-listing')
+
+
+def job_listing_cached(ctx, i):
+    return ctx.employee.get('/job-listing')
+
+
+@uncached
+def job_listing_filtered(ctx, i):
+    return ctx.employee.get('/job-listing', query_string=FILTERS[i % len(FILTERS)])
+
+
+@uncached
+def job_listing_next_page(ctx, i):
+    return ctx.employee.get(ctx.next_page_url)
+
+
+def apply_job(ctx, i):
+    job_id = ctx.job_ids[i % len(ctx.job_ids)]
+    return ctx.employee.post(f'/apply-job/{job_id}', data={'email': 'bench@example.com', 'phone': '9876543210'})
+
+
+def recommended_jobs(ctx, i):
+    return ctx.applicant.get('/recommended-jobs')
+
+
+def application_management(ctx, i):
+    return ctx.employer.get('/application-management', query_string={'status': 'pending'} if i % 2 else {})
+
+
+def chat_poll(ctx, i):
+    if not ctx.chats:
+        return ctx.employer.get('/job-listing')
+    application_id, last_id = ctx.chats[i % len(ctx.chats)]
+    return ctx.employer.get(f'/messages/{application_id}/after/{last_id}')
+
+
+SCENARIOS = {
+    'login': login,
+    'job_listing': job_listing,
+    'job_listing_cached': job_listing_cached,
+    'job_listing_filtered': job_listing_filtered,
+    'job_listing_next_page': job_listing_next_page,
+    'apply_job': apply_job,
+    'recommended_jobs': recommended_jobs,
+    'application_management': application_management,
+    'chat_poll': chat_poll,
+}
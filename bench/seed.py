@@ -0,0 +1,197 @@
+"""Seeded synthetic data for benchmarks.
+
+    DATABASE_URL=sqlite:///bench.db python -m bench.seed --rows 100000
+
+``--rows`` is the approximate total across all tables (1k to 1M). The same
+``--seed`` always produces the same data, so runs are comparable.
+"""
+import argparse
+import random
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert
+
+# Bilingual vocabulary: (English, Tamil)
+TITLES = [
+    ("Electrician", "மின்பணியாளர்"), ("Driver", "ஓட்டுநர்"), ("Tailor", "தையல்காரர்"),
+    ("Cook", "சமையல்காரர்"), ("Mason", "கொத்தனார்"), ("Plumber", "குழாய் பணியாளர்"),
+    ("Sales Executive", "விற்பனை நிர்வாகி"), ("Security Guard", "பாதுகாவலர்"),
+    ("Teacher", "ஆசிரியர்"), ("Nurse", "செவிலியர்"), ("Welder", "வெல்டர்"),
+    ("Delivery Boy", "டெலிவரி பணியாளர்"), ("Accountant", "கணக்காளர்"), ("Helper", "உதவியாளர்"),
+]
+LOCATIONS = [
+    ("Madurai", "மதுரை"), ("Chennai", "சென்னை"), ("Coimbatore", "கோயம்புத்தூர்"),
+    ("Tiruchirappalli", "திருச்சிராப்பள்ளி"), ("Salem", "சேலம்"), ("Tirunelveli", "திருநெல்வேலி"),
+    ("Erode", "ஈரோடு"), ("Vellore", "வேலூர்"), ("Thoothukudi", "தூத்துக்குடி"),
+    ("Thanjavur", "தஞ்சாவூர்"), ("Dindigul", "திண்டுக்கல்"), ("Karur", "கரூர்"),
+    ("Nagercoil", "நாகர்கோவில்"), ("Hosur", "ஓசூர்"), ("Kanchipuram", "காஞ்சிபுரம்"),
+]
+COMPANIES = ["Sri Murugan Traders", "Annai Textiles", "Kaveri Motors", "Meenakshi Stores",
+             "Vetri Constructions", "Thamarai Hotels", "Selvam Agencies", "Pandian Logistics"]
+DESCRIPTIONS = [
+    ("Daily wage work, immediate joining. Experience preferred.", "தினசரி கூலி வேலை, உடனடி சேர்க்கை. அனுபவம் விரும்பத்தக்கது."),
+    ("Full time role with weekly salary and food provided.", "வாராந்திர சம்பளம் மற்றும் உணவுடன் முழு நேர வேலை."),
+    ("Part time evening shift near the bus stand.", "பேருந்து நிலையம் அருகில் மாலை நேர பகுதி நேர வேலை."),
+]
+MESSAGES = [("When can you come for the interview?", "நேர்காணலுக்கு எப்போது வர முடியும்?"),
+            ("I can join from Monday.", "திங்கள் முதல் சேர முடியும்."),
+            ("Please bring your ID proof.", "உங்கள் அடையாள அட்டையைக் கொண்டு வாருங்கள்.")]
+NAMES = ["Karthik", "Priya", "Murugan", "Lakshmi", "Senthil", "Divya", "முருகன்", "லட்சுமி", "செந்தில்", "கவிதா"]
+
+BENCH_PASSWORD = "password"
+CHUNK = 5000
+LIFETIMES_DAYS = (7, 15, 30, 60, 90)  # closing dates employers pick, from daily-wage to permanent roles
+FILLED_SHARE = 0.15  # postings closed as filled before their closing date
+
+
+def plan(rows):
+    """Split a total row budget across the tables."""
+    return {
+        'users': max(rows // 10, 20),
+        'jobs': max(rows // 5, 20),
+        'applications': max(rows * 2 // 5, 20),
+        'messages': max(rows // 5, 20),
+        'notifications': max(rows // 10, 20),
+    }
+
+
+def _insert(model, rows):
+    from models import db
+    for start in range(0, len(rows), CHUNK):
+        db.session.execute(insert(model), rows[start:start + CHUNK])
+    db.session.commit()
+
+
+def seed(rows=10000, seed_value=42):
+    """Fill an empty database with synthetic users, jobs, applications, messages and notifications.
+
+    Employer 1 (mobile 9000000001) and employee 1 (mobile 8000000001) are the
+    accounts benchmark scenarios log in as. Returns the table sizes.
+    """
+    from models import (User, Job, Application, Message, Notification, NotificationCounter)
+    from places import gazetteer
+
+    if User.query.first() is not None:
+        raise RuntimeError("Refusing to seed a database that already has users")
+
+    rng = random.Random(seed_value)
+    sizes = plan(rows)
+    now = datetime.utcnow()
+
+    n_employers = max(sizes['users'] // 20, 2)
+    users = []
+    for user_id in range(1, sizes['users'] + 1):
+        is_employer = user_id <= n_employers
+        users.append({
+            'id': user_id,
+            'name': rng.choice(NAMES),
+            'mobile': f"{9000000000 + user_id}" if is_employer else f"{8000000000 + user_id - n_employers}",
+            'password': BENCH_PASSWORD,
+            'role': 'employer' if is_employer else 'employee',
+        })
+    _insert(User, users)
+    employee_ids = range(n_employers + 1, sizes['users'] + 1)
+
+    jobs = []
+    for job_id in range(1, sizes['jobs'] + 1):
+        tamil = rng.random() < 0.5
+        pick = 1 if tamil else 0
+        location = rng.choice(LOCATIONS)[pick]
+        location_key, latitude, longitude = gazetteer().locate(location)
+        posted_at = now - timedelta(minutes=rng.randrange(180 * 24 * 60))
+        expires_at = posted_at + timedelta(days=rng.choice(LIFETIMES_DAYS))
+        # As the expiry sweeper and employers would have left them
+        if expires_at < now:
+            status, closed_at = 'expired', expires_at
+        elif rng.random() < FILLED_SHARE:
+            status, closed_at = 'filled', posted_at + (now - posted_at) * rng.random()
+        else:
+            status, closed_at = 'open', None
+        jobs.append({
+            'id': job_id,
+            'title': rng.choice(TITLES)[pick],
+            'description': rng.choice(DESCRIPTIONS)[pick],
+            'company': rng.choice(COMPANIES),
+            'location': location,
+            'location_key': location_key,
+            'latitude': latitude,
+            'longitude': longitude,
+            'posted_at': posted_at,
+            'status': status,
+            'expires_at': expires_at,
+            'closed_at': closed_at,
+            # Employer 1 owns a bigger share, like a busy agency
+            'user_id': 1 if rng.random() < 0.2 else rng.randint(1, n_employers),
+        })
+    _insert(Job, jobs)
+    job_owner = {job['id']: job['user_id'] for job in jobs}
+    del jobs
+
+    applications = []
+    seen = set()
+    # Employee 1 is left without applications so apply_job always has fresh jobs
+    first_employee = n_employers + 1
+    while len(applications) < sizes['applications'] and len(seen) < len(employee_ids) * sizes['jobs']:
+        job_id = rng.randint(1, sizes['jobs'])
+        applicant_id = rng.randint(first_employee + 1, sizes['users']) if len(employee_ids) > 1 else first_employee
+        if (job_id, applicant_id) in seen:
+            continue
+        seen.add((job_id, applicant_id))
+        applications.append({
+            'id': len(applications) + 1,
+            'job_id': job_id,
+            'applicant_id': applicant_id,
+            'status': rng.choices(['pending', 'approved', 'rejected'], [6, 2, 2])[0],
+            'message': "",
+            'email': f"user{applicant_id}@example.com",
+            'phone': f"{8000000000 + applicant_id}",
+        })
+    del seen
+    _insert(Application, applications)
+
+    messages = []
+    for message_id in range(1, sizes['messages'] + 1):
+        application = rng.choice(applications)
+        sender_id = rng.choice([application['applicant_id'], job_owner[application['job_id']]])
+        messages.append({
+            'id': message_id,
+            'application_id': application['id'],
+            'sender_id': sender_id,
+            'content': rng.choice(MESSAGES)[rng.random() < 0.5],
+            'timestamp': now - timedelta(minutes=rng.randrange(30 * 24 * 60)),
+        })
+    _insert(Message, messages)
+    del messages
+
+    notifications = []
+    unread = {}
+    for notification_id in range(1, sizes['notifications'] + 1):
+        user_id = rng.choice(employee_ids)
+        is_read = rng.random() < 0.7
+        if not is_read:
+            unread[user_id] = unread.get(user_id, 0) + 1
+        notifications.append({
+            'id': notification_id,
+            'user_id': user_id,
+            'message': "Your application has been approved.",
+            'timestamp': now - timedelta(minutes=rng.randrange(30 * 24 * 60)),
+            'is_read': is_read,
+        })
+    _insert(Notification, notifications)
+    _insert(NotificationCounter, [{'user_id': user_id, 'unread': count} for user_id, count in unread.items()])
+
+    sizes['applications'] = len(applications)
+    return sizes
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Seed a database with synthetic Thozhil Bazaar data.")
+    parser.add_argument("--rows", type=int, default=10000, help="approximate total rows (1k to 1M)")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    from app import app
+    from models import db
+    with app.app_context():
+        db.create_all()
+        print(seed(args.rows, args.seed))
@@ -0,0 +1,161 @@
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import parse_qs, urlparse
+
+try:
+    import redis
+except ImportError:  # optional, only needed for redis:// cache URLs
+    redis = None
+
+
+class MemoryCache:
+    """In-process LRU cache bounded by the total size of its values.
+
+    Entries can carry tags; ``invalidate_tags`` drops every entry with any of
+    the given tags, which is how writes evict exactly the pages they touch.
+    """
+
+    shared = False  # each process has its own
+
+    def __init__(self, max_bytes=32 * 1024 * 1024, default_ttl=300):
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> (value, expires_at, tags)
+        self._tags = {}  # tag -> set of keys
+        self._size = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[1] < time.monotonic():
+                self._delete(key)
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def set(self, key, value, tags=(), ttl=None):
+        if len(value) > self.max_bytes:
+            return
+        expires_at = time.monotonic() + (ttl or self.default_ttl)
+        with self._lock:
+            self._delete(key)
+            self._entries[key] = (value, expires_at, tuple(tags))
+            self._size += len(value)
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+            while self._size > self.max_bytes:
+                self._delete(next(iter(self._entries)))
+
+    def delete(self, key):
+        with self._lock:
+            self._delete(key)
+
+    def invalidate_tags(self, tags):
+        with self._lock:
+            for tag in tags:
+                for key in self._tags.pop(tag, ()):
+                    self._delete(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._tags.clear()
+            self._size = 0
+
+    def _delete(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        self._size -= len(entry[0])
+        for tag in entry[2]:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+
+# Extend each tag set's TTL to ARGV[1] seconds unless it already lives
+# longer, so a short-lived entry never cuts short the tags of longer ones
+EXTEND_TAGS_SCRIPT = """
+local ttl = tonumber(ARGV[1])
+for _, key in ipairs(KEYS) do
+    if redis.call('TTL', key) < ttl then
+        redis.call('EXPIRE', key, ttl)
+    end
+end
+"""
+
+
+class RedisCache:
+    """Cache shared by all workers on a host, backed by Redis or anything speaking its protocol.
+
+    Size limits and LRU eviction are left to the server's ``maxmemory`` and
+    ``maxmemory-policy allkeys-lru`` settings. Tags are Redis sets of keys
+    that live as long as the longest-lived entry carrying them.
+    """
+
+    shared = True
+
+    def __init__(self, client, prefix='tb:', default_ttl=300):
+        self.client = client
+        self.prefix = prefix
+        self.default_ttl = default_ttl
+        self._extend_tags = client.register_script(EXTEND_TAGS_SCRIPT)
+
+    def get(self, key):
+        return self.client.get(self.prefix + key)
+
+    def set(self, key, value, tags=(), ttl=None):
+        ttl = ttl or self.default_ttl
+        pipe = self.client.pipeline()
+        pipe.set(self.prefix + key, value, ex=ttl)
+        tag_keys = [self.prefix + 'tag:' + tag for tag in tags]
+        for tag_key in tag_keys:
+            pipe.sadd(tag_key, key)
+        if tag_keys:
+            self._extend_tags(keys=tag_keys, args=[ttl], client=pipe)
+        pipe.execute()
+
+    def delete(self, key):
+        self.client.delete(self.prefix + key)
+
+    def invalidate_tags(self, tags):
+        tag_keys = [self.prefix + 'tag:' + tag for tag in tags]
+        if not tag_keys:
+            return
+        pipe = self.client.pipeline()
+        for tag_key in tag_keys:
+            pipe.smembers(tag_key)
+        members = pipe.execute()
+        keys = {self.prefix + (key.decode() if isinstance(key, bytes) else key)
+                for keys in members for key in keys}
+        self.client.delete(*keys, *tag_keys)
+
+    def clear(self):
+        keys = list(self.client.scan_iter(self.prefix + '*'))
+        if keys:
+            self.client.delete(*keys)
+
+
+def make_cache(url, client=None):
+    """Build a cache from a URL: ``memory://?max_bytes=N&ttl=S`` or ``redis://host:port/db``.
+
+    ``client`` overrides the Redis connection, e.g. with a local stand-in.
+    """
+    parsed = urlparse(url or 'memory://')
+    options = {name: values[0] for name, values in parse_qs(parsed.query).items()}
+    ttl = int(options.get('ttl', 300))
+    if parsed.scheme == 'memory':
+        return MemoryCache(max_bytes=int(options.get('max_bytes', 32 * 1024 * 1024)), default_ttl=ttl)
+    if parsed.scheme in ('redis', 'rediss', 'unix'):
+        if client is None:
+            if redis is None:
+                raise RuntimeError("The redis package is required for a redis:// cache URL")
+            client = redis.Redis.from_url(url.split('?')[0])
+        return RedisCache(client, prefix=options.get('prefix', 'tb:'), default_ttl=ttl)
+    raise ValueError(f"Unsupported cache URL: {url}")
@@ -0,0 +1,100 @@
+"""Connection pool settings and read/write splitting between primary and replicas.
+
+Set DATABASE_REPLICA_URLS to a comma-separated list of replica URLs. Views
+marked ``@read_only`` then send their SELECTs to a replica, picked once per
+request. Everything else goes to the primary: writes, SELECT ... FOR UPDATE,
+reads in a request that has already written, and every read by a browser
+for READ_AFTER_WRITE_SECONDS after one of its requests wrote, so a user
+always sees their own message or application straight away.
+"""
+import os
+import random
+import time
+from functools import wraps
+
+from flask import g, has_request_context, session
+from flask_sqlalchemy.session import Session
+from sqlalchemy.sql import Select
+from sqlalchemy.sql.dml import UpdateBase
+
+REPLICA_BIND_PREFIX = "replica_"
+PRIMARY_PIN_KEY = "_primary_until"
+
+
+def engine_options(url):
+    """Pool options for ``url`` from DB_POOL_* environment variables.
+
+    ``pool_recycle`` stays under MySQL's default ``wait_timeout`` so idle
+    connections are replaced before the server drops them, and
+    ``pool_pre_ping`` catches the ones it dropped anyway. In-memory SQLite
+    uses a single static connection, so it gets no pool sizing.
+    """
+    options = {
+        'pool_pre_ping': os.getenv("DB_POOL_PRE_PING", "1") != "0",
+        'pool_recycle': int(os.getenv("DB_POOL_RECYCLE", "280")),
+    }
+    if url.startswith("sqlite") and (":memory:" in url or url.rstrip("/") == "sqlite:"):
+        return options
+    options.update(
+        pool_size=int(os.getenv("DB_POOL_SIZE", "5")),
+        max_overflow=int(os.getenv("DB_MAX_OVERFLOW", "10")),
+        pool_timeout=int(os.getenv("DB_POOL_TIMEOUT", "30")),
+    )
+    return options
+
+
+def configure(app, primary_url, replica_urls=None):
+    """Set the primary and replica engines on ``app`` before ``db.init_app``."""
+    if replica_urls is None:
+        replica_urls = [url.strip() for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if url.strip()]
+    app.config['SQLALCHEMY_DATABASE_URI'] = primary_url
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(primary_url)
+    app.config['SQLALCHEMY_BINDS'] = {
+        f"{REPLICA_BIND_PREFIX}{i}": dict(engine_options(url), url=url) for i, url in enumerate(replica_urls)
+    }
+    app.config.setdefault('READ_AFTER_WRITE_SECONDS', int(os.getenv("READ_AFTER_WRITE_SECONDS", "10")))
+
+    @app.after_request
+    def pin_to_primary(response):
+        # Keep this browser on the primary until the replicas have caught up
+        if app.config['SQLALCHEMY_BINDS'] and g.get('_db_wrote'):
+            session[PRIMARY_PIN_KEY] = time.time() + app.config['READ_AFTER_WRITE_SECONDS']
+        return response
+
+
+def read_only(view):
+    """Mark a view whose SELECTs may be served by a replica."""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        g._db_read_only = True
+        return view(*args, **kwargs)
+    return wrapper
+
+
+def served_by_replica():
+    """True if this request has read from a replica."""
+    return has_request_context() and g.get('_db_replica') is not None
+
+
+class RoutingSession(Session):
+    """Session that picks a replica for reads in ``@read_only`` views."""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and has_request_context():
+            if self._flushing or isinstance(clause, UpdateBase):
+                g._db_wrote = True
+            elif isinstance(clause, Select) and clause._for_update_arg is None:
+                replica = self._replica()
+                if replica is not None:
+                    return replica
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+    def _replica(self):
+        if not g.get('_db_read_only') or g.get('_db_wrote'):
+            return None
+        if session.get(PRIMARY_PIN_KEY, 0) > time.time():
+            return None
+        if '_db_replica' not in g:
+            replicas = [key for key in self._db.engines if key and key.startswith(REPLICA_BIND_PREFIX)]
+            g._db_replica = self._db.engines[random.choice(replicas)] if replicas else None
+        return g._db_replica
@@ -0,0 +1,86 @@
+import csv
+import importlib.util
+import io
+import tempfile
+
+from sqlalchemy import select
+
+import lifecycle
+from models import db, User, Job, Application
+
+EXPORT_HEADER = ('name', 'mobile', 'email', 'phone', 'status', 'job_title')
+FLUSH_BYTES = 64 * 1024
+FILE_CHUNK_BYTES = 64 * 1024
+# Spreadsheet apps run a cell starting with one of these as a formula
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+def application_rows(employer_id, status=None, job_id=None, chunk_size=1000):
+    """Yield export rows for an employer's applications from a server-side cursor.
+
+    One joined SELECT; rows are fetched ``chunk_size`` at a time, so memory
+    stays flat however many applications there are.
+    """
+    stmt = (select(User.name, User.mobile, Application.email, Application.phone, Application.status, Job.title)
+            .select_from(Application)
+            .join(Job, Job.id == Application.job_id)
+            .join(User, User.id == Application.applicant_id)
+            .where(Job.user_id == employer_id, Job.status != lifecycle.DELETED)
+            .order_by(Application.id))
+    if status:
+        stmt = stmt.where(Application.status == status)
+    if job_id:
+        stmt = stmt.where(Application.job_id == job_id)
+
+    result = db.session.execute(stmt, execution_options={'stream_results': True, 'yield_per': chunk_size})
+    for partition in result.partitions():
+        yield from partition
+
+
+def escape_formula(value):
+    """Prefix applicant-entered text that a spreadsheet would run as a formula with a quote."""
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def stream_csv(rows):
+    """Encode rows as UTF-8 CSV in ~64 KB chunks. The BOM lets Excel show Tamil text."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    buffer.write('\ufeff')
+    writer.writerow(EXPORT_HEADER)
+    for row in rows:
+        writer.writerow([escape_formula(value) for value in row])
+        if buffer.tell() >= FLUSH_BYTES:
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode('utf-8')
+
+
+def xlsx_available():
+    """Whether openpyxl is installed, checked without importing it."""
+    return importlib.util.find_spec('openpyxl') is not None
+
+
+def stream_xlsx(rows):
+    """Write rows to a write-only workbook on disk and stream the file back in chunks."""
+    # openpyxl is optional and slow to import, so it is only loaded for an XLSX export
+    try:
+        from openpyxl import Workbook
+    except ImportError:
+        raise RuntimeError("The openpyxl package is required for XLSX exports") from None
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet('applications')
+    sheet.append(EXPORT_HEADER)
+    for row in rows:
+        sheet.append([escape_formula(value) for value in row])
+    with tempfile.TemporaryFile() as spool:
+        workbook.save(spool)
+        spool.seek(0)
+        while True:
+            chunk = spool.read(FILE_CHUNK_BYTES)
+            if not chunk:
+                break
+            yield chunk
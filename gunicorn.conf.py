@@ -0,0 +1,33 @@
+"""gunicorn settings: gunicorn -c gunicorn.conf.py app:app
+
+The app is imported once in the master and warmed up there, so workers fork
+with the translations and gazetteer already loaded and share those pages
+copy-on-write instead of each reading and parsing the files. No database
+connection is opened before the fork; each worker's pool connects on its
+first query.
+"""
+import multiprocessing
+import os
+
+bind = os.getenv("BIND", "0.0.0.0:8000")
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count() * 2 + 1))
+# Chat streams hold a connection open, so each worker serves requests on
+# threads and keeps half of them for other requests (SSE_MAX_STREAMS). With
+# WORKER_CLASS=gevent (pip install gevent) a stream is a greenlet and a
+# worker can hold a thousand of them.
+worker_class = os.getenv("WORKER_CLASS", "gthread")
+threads = int(os.getenv("WEB_THREADS", 8))
+os.environ.setdefault("SSE_MAX_STREAMS", str(1000 if worker_class == "gevent" else max(threads // 2, 1)))
+if worker_class == "gevent":
+    # Patch before the preloaded app creates its locks, or a waiting stream blocks the whole worker
+    from gevent import monkey
+    monkey.patch_all()
+preload_app = True
+
+
+def when_ready(server):
+    from app import user_state, warm_up
+    warm_up()
+    if workers > 1 and not user_state.cache.shared:
+        server.log.warning("USER_STATE_CACHE_URL is process-local; point it at redis:// so workers "
+                           "share per-user state instead of re-reading it every few seconds")
@@ -0,0 +1,118 @@
+import codecs
+import csv
+import json
+from datetime import datetime
+
+from sqlalchemy import insert
+
+import lifecycle
+from models import db, Job
+from places import gazetteer
+
+# Column limits mirror the Job model
+FIELD_LIMITS = {'title': 100, 'description': None, 'company': 100, 'location': 100}
+MAX_REPORTED_ERRORS = 1000
+
+
+def detect_format(filename, default='csv'):
+    """Guess the import format from a file name."""
+    name = (filename or '').lower()
+    if name.endswith('.jsonl') or name.endswith('.ndjson'):
+        return 'jsonl'
+    if name.endswith('.csv'):
+        return 'csv'
+    return default
+
+
+def iter_rows(stream, fmt):
+    """Yield ``(line_number, row)`` from a binary stream, one row at a time.
+
+    Rows that can't be parsed are yielded as ``(line_number, ValueError)``.
+    """
+    text = codecs.getreader('utf-8-sig')(stream, errors='replace')
+    if fmt == 'jsonl':
+        for line_number, line in enumerate(text, start=1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError as e:
+                yield line_number, ValueError(f"invalid JSON: {e}")
+                continue
+            if not isinstance(row, dict):
+                yield line_number, ValueError("expected a JSON object")
+                continue
+            yield line_number, row
+    else:
+        reader = csv.DictReader(text)
+        for row in reader:
+            yield reader.line_num, row
+
+
+def validate_row(row):
+    """Return ``(values, None)`` for a valid row or ``(None, error message)``."""
+    values = {}
+    for field, limit in FIELD_LIMITS.items():
+        value = row.get(field)
+        value = str(value).strip() if value is not None else ''
+        if not value:
+            return None, f"{field} is required"
+        if limit and len(value) > limit:
+            return None, f"{field} is longer than {limit} characters"
+        values[field] = value
+    return values, None
+
+
+def import_jobs(stream, fmt, employer_id, chunk_size=500, on_batch=None):
+    """Stream jobs from ``stream`` into the database in chunked transactions.
+
+    Valid rows are inserted with one multi-row INSERT per chunk; only the
+    current chunk is held in memory. ``on_batch`` is called after each
+    committed chunk with its rows, so indexes and caches refresh once per
+    batch. Returns a report with the number imported and per-row errors
+    (the first ``MAX_REPORTED_ERRORS`` of them).
+    """
+    report = {'imported': 0, 'failed': 0, 'batches': 0, 'errors': []}
+
+    def add_error(line_number, message):
+        report['failed'] += 1
+        if len(report['errors']) < MAX_REPORTED_ERRORS:
+            report['errors'].append({'line': line_number, 'error': message})
+
+    def flush(chunk):
+        now = datetime.utcnow()
+        rows = []
+        for _, values in chunk:
+            location_key, latitude, longitude = gazetteer().locate(values['location'])
+            rows.append(dict(values, user_id=employer_id, posted_at=now, status=lifecycle.OPEN,
+                             expires_at=lifecycle.default_expiry(now),
+                             location_key=location_key, latitude=latitude, longitude=longitude))
+        try:
+            db.session.execute(insert(Job).values(rows))
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            for line_number, _ in chunk:
+                add_error(line_number, f"database error: {e}")
+            return
+        report['imported'] += len(chunk)
+        report['batches'] += 1
+        if on_batch is not None:
+            on_batch(rows)
+
+    chunk = []
+    for line_number, row in iter_rows(stream, fmt):
+        if isinstance(row, Exception):
+            add_error(line_number, str(row))
+            continue
+        values, error = validate_row(row)
+        if error:
+            add_error(line_number, error)
+            continue
+        chunk.append((line_number, values))
+        if len(chunk) >= chunk_size:
+            flush(chunk)
+            chunk = []
+    if chunk:
+        flush(chunk)
+    return report
@@ -0,0 +1,96 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import update
+
+from models import db, Job, Application, Message, MessageArchive
+
+# A job is open until it is filled, passes its expiry date or is deleted.
+# Only open jobs are in the listing, search and count paths; the
+# (status, posted_at, id) index keeps them a compact hot range of the job
+# table, while filled and expired jobs stay in place for the employer's
+# history, with their applications and chats. Deleted jobs are hidden at
+# once and purged by the worker, together with everything that points at
+# them, a batch at a time.
+
+OPEN, FILLED, EXPIRED, DELETED = 'open', 'filled', 'expired', 'deleted'
+CLOSED_STATUSES = (FILLED, EXPIRED)
+JOB_LIFETIME_DAYS = 30  # default time a posting stays open
+MAX_LIFETIME_DAYS = 90
+PURGE_BATCH = 500  # applications removed per transaction
+
+
+def default_expiry(posted_at=None):
+    return (posted_at or datetime.utcnow()) + timedelta(days=JOB_LIFETIME_DAYS)
+
+
+def parse_expiry(value, now=None):
+    """Return the expiry for a "closes on" date from a form, the default for an empty one, or None if invalid.
+
+    A job closes at the end of the chosen day, which must be between today
+    and ``MAX_LIFETIME_DAYS`` from now.
+    """
+    now = now or datetime.utcnow()
+    if not value:
+        return default_expiry(now)
+    try:
+        day = datetime.strptime(value, "%Y-%m-%d")
+    except ValueError:
+        return None
+    if not now.date() <= day.date() <= (now + timedelta(days=MAX_LIFETIME_DAYS)).date():
+        return None
+    return day.replace(hour=23, minute=59, second=59)
+
+
+def close_job(job_id, status):
+    """Close an open job as filled or expired. Returns whether it was open."""
+    return bool(Job.query
+                .filter_by(id=job_id, status=OPEN)
+                .update({'status': status, 'closed_at': datetime.utcnow()}, synchronize_session=False))
+
+
+def expire_due_jobs(batch_size=1000, now=None):
+    """Expire open jobs past their expiry date, up to ``batch_size`` per call. Returns how many."""
+    now = now or datetime.utcnow()
+    job_ids = [job_id for (job_id,) in (db.session.query(Job.id)
+                                        .filter(Job.status == OPEN, Job.expires_at < now)
+                                        .order_by(Job.expires_at)
+                                        .limit(batch_size)
+                                        .with_for_update(skip_locked=True))]
+    if job_ids:
+        # The status check again, in case the employer filled one meanwhile
+        db.session.execute(update(Job)
+                           .where(Job.id.in_(job_ids), Job.status == OPEN)
+                           .values(status=EXPIRED, closed_at=now)
+                           .execution_options(synchronize_session=False))
+    db.session.commit()
+    return len(job_ids)
+
+
+def purge_deleted_jobs(max_jobs=10, batch_size=PURGE_BATCH):
+    """Remove up to ``max_jobs`` deleted jobs and their applications, messages and archives.
+
+    Each transaction removes at most ``batch_size`` applications with their
+    chats, so a job with many applicants never holds long locks; a job row
+    goes once nothing references it. Returns ``(jobs, applications)`` purged.
+    """
+    job_ids = [job_id for (job_id,) in (db.session.query(Job.id)
+                                        .filter(Job.status == DELETED)
+                                        .order_by(Job.id)
+                                        .limit(max_jobs))]
+    applications = 0
+    for job_id in job_ids:
+        while True:
+            application_ids = [application_id for (application_id,) in (db.session.query(Application.id)
+                                                                        .filter(Application.job_id == job_id)
+                                                                        .limit(batch_size))]
+            if not application_ids:
+                break
+            Message.query.filter(Message.application_id.in_(application_ids)).delete(synchronize_session=False)
+            (MessageArchive.query.filter(MessageArchive.application_id.in_(application_ids))
+             .delete(synchronize_session=False))
+            Application.query.filter(Application.id.in_(application_ids)).delete(synchronize_session=False)
+            db.session.commit()
+            applications += len(application_ids)
+        Job.query.filter_by(id=job_id, status=DELETED).delete(synchronize_session=False)
+        db.session.commit()
+    return len(job_ids), applications
@@ -0,0 +1,128 @@
+from sqlalchemy import func, select, union_all
+from sqlalchemy.orm import contains_eager, joinedload
+
+import archive
+import lifecycle
+from models import db, Job, Application, Message, MessageArchive
+from pagination import KeysetPage, paginate_by_id
+
+# Each loader issues a fixed number of set-based queries, however many rows
+# the page shows, so templates never trigger per-row lazy loads.
+
+APPLICATION_STATUSES = ('pending', 'approved', 'rejected')
+THREAD_PAGE_SIZE = 50
+
+
+def load_application_page(employer_id, status=None, before=None, after=None, per_page=20):
+    """Load one page of applications to an employer's jobs.
+
+    Two queries: the page itself (joined with its job and applicant) and the
+    message counts of the applications on it.
+    """
+    query = (Application.query
+             .join(Application.job)
+             .filter(Job.user_id == employer_id, Job.status != lifecycle.DELETED)
+             .options(contains_eager(Application.job), joinedload(Application.applicant)))
+    if status in APPLICATION_STATUSES:
+        query = query.filter(Application.status == status)
+
+    page = paginate_by_id(query, Application.id, before=before, after=after, per_page=per_page)
+    counts = message_counts([application.id for application in page.items])
+    page.items = [{
+        'application': application,
+        'job': application.job,
+        'employee': application.applicant,
+        'message_count': counts.get(application.id, 0),
+    } for application in page.items]
+    return page
+
+
+def message_counts(application_ids):
+    """Return ``{application_id: number of messages}``, archived ones included, in one query."""
+    if not application_ids:
+        return {}
+    hot = (select(Message.application_id, func.count(Message.id))
+           .where(Message.application_id.in_(application_ids))
+           .group_by(Message.application_id))
+    cold = (select(MessageArchive.application_id, func.sum(MessageArchive.message_count))
+            .where(MessageArchive.application_id.in_(application_ids))
+            .group_by(MessageArchive.application_id))
+    counts = {}
+    for application_id, count in db.session.execute(union_all(hot, cold)):
+        counts[application_id] = counts.get(application_id, 0) + int(count)
+    return counts
+
+
+def load_approved_applications(applicant_id):
+    """Load an employee's approved applications together with their jobs."""
+    return (Application.query
+            .join(Application.job)
+            .filter(Application.applicant_id == applicant_id, Application.status == 'approved',
+                    Job.status != lifecycle.DELETED)
+            .options(contains_eager(Application.job))
+            .order_by(Application.id.desc())
+            .all())
+
+
+def load_employer_jobs(employer_id, before=None, after=None, per_page=20):
+    """Load one page of an employer's jobs in every lifecycle state but deleted, newest first."""
+    query = Job.query.filter(Job.user_id == employer_id, Job.status != lifecycle.DELETED)
+    return paginate_by_id(query, Job.id, before=before, after=after, per_page=per_page)
+
+
+def load_closed_job_texts(job_ids):
+    """Return ``{job_id: (title, description, location)}`` of the given jobs that are filled or expired."""
+    rows = db.session.execute(select(Job.id, Job.title, Job.description, Job.location)
+                              .where(Job.id.in_(job_ids), Job.status.in_(lifecycle.CLOSED_STATUSES)))
+    return {job_id: (title, description, location) for job_id, title, description, location in rows}
+
+
+def load_application(application_id):
+    """Load an application with its job, or None."""
+    return (Application.query
+            .options(joinedload(Application.job))
+            .filter_by(id=application_id)
+            .first())
+
+
+def load_thread_page(application_id, before=None, per_page=THREAD_PAGE_SIZE):
+    """Load the newest ``per_page`` messages of a thread older than the ``before`` key.
+
+    Messages come from the hot table first and continue into the archive
+    once it runs out. Items are oldest first for display; ``next_key`` is
+    the key to pass as ``before`` for the next older page: a message id in
+    the table, or ``a<chunk>.<index>`` in the archive. Raises ValueError for
+    a malformed key.
+    """
+    items = []
+    archived_before = None
+    if before is not None and before.startswith('a'):
+        chunk_id, index = before[1:].split('.')
+        archived_before = (int(chunk_id), int(index))
+    else:
+        query = (Message.query
+                 .filter_by(application_id=application_id)
+                 .options(joinedload(Message.sender)))
+        if before is not None:
+            query = query.filter(Message.id < int(before))
+        items = query.order_by(Message.id.desc()).limit(per_page + 1).all()
+    if len(items) <= per_page:
+        items += archive.load_archived(application_id, archived_before, limit=per_page + 1 - len(items))
+
+    has_older = len(items) > per_page
+    items = items[:per_page]
+    next_key = None
+    if has_older:
+        oldest = items[-1]
+        next_key = "a%d.%d" % oldest.position if isinstance(oldest, archive.ArchivedMessage) else str(oldest.id)
+    return KeysetPage(list(reversed(items)), next_key=next_key)
+
+
+def load_thread_after(application_id, after_id, limit=100):
+    """Load up to ``limit`` messages of an application newer than ``after_id``."""
+    return (Message.query
+            .filter(Message.application_id == application_id, Message.id > after_id)
+            .options(joinedload(Message.sender))
+            .order_by(Message.id)
+            .limit(limit)
+            .all())
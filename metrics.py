@@ -0,0 +1,247 @@
+"""Per-request SQL, render and size instrumentation exposed as Prometheus metrics.
+
+Each request records its SQL query count and time, lazy relationship loads,
+template render time, total time and response size under its endpoint.
+Slow requests are logged with their most expensive statements.
+
+Metrics live in the worker process. Set METRICS_DIR to a directory shared
+by the gunicorn workers and each worker snapshots its metrics there every
+few seconds; /metrics then reports the sum over all workers.
+"""
+import glob
+import json
+import logging
+import os
+import threading
+import time
+
+from flask import Response, g, has_request_context, request
+from flask.signals import before_render_template, template_rendered
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger("metrics.slow_requests")
+
+TIME_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 200)
+SIZE_BUCKETS = (1024, 4096, 16384, 65536, 262144, 1048576)
+
+SNAPSHOT_INTERVAL = 5.0
+MAX_STATEMENTS = 200  # statements remembered per request for the slow log
+SLOW_STATEMENTS_LOGGED = 5
+
+
+class Histogram:
+    """Cumulative histogram per label value, in the Prometheus exposition format."""
+
+    def __init__(self, name, help_text, buckets):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = buckets
+        self.series = {}  # endpoint -> [bucket counts..., +Inf count, sum]
+
+    def observe(self, endpoint, value):
+        series = self.series.get(endpoint)
+        if series is None:
+            series = self.series[endpoint] = [0] * (len(self.buckets) + 1) + [0.0]
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                series[i] += 1
+                break
+        else:
+            series[len(self.buckets)] += 1
+        series[-1] += value
+
+    def render(self, series_by_endpoint):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        for endpoint, series in sorted(series_by_endpoint.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + ('+Inf',), series[:-1]):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{endpoint="{endpoint}",le="{bound}"}} {cumulative}')
+            lines.append(f'{self.name}_sum{{endpoint="{endpoint}"}} {series[-1]}')
+            lines.append(f'{self.name}_count{{endpoint="{endpoint}"}} {cumulative}')
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.histograms = {
+            'duration': Histogram("http_request_duration_seconds", "Total request time.", TIME_BUCKETS),
+            'sql_time': Histogram("http_request_sql_duration_seconds", "Time spent in SQL per request.", TIME_BUCKETS),
+            'queries': Histogram("http_request_sql_queries", "SQL statements per request.", COUNT_BUCKETS),
+            'lazy_loads': Histogram("http_request_lazy_loads", "Lazy relationship loads per request.", COUNT_BUCKETS),
+            'render_time': Histogram("http_request_render_duration_seconds", "Template render time per request.", TIME_BUCKETS),
+            'size': Histogram("http_response_size_bytes", "Response body size.", SIZE_BUCKETS),
+        }
+        self.snapshot_at = 0.0
+
+    def observe(self, endpoint, values):
+        with self.lock:
+            for key, value in values.items():
+                if value is not None:
+                    self.histograms[key].observe(endpoint, value)
+
+    def snapshot(self):
+        with self.lock:
+            return {key: {endpoint: list(series) for endpoint, series in histogram.series.items()}
+                    for key, histogram in self.histograms.items()}
+
+    def render(self, snapshots):
+        lines = []
+        for key, histogram in self.histograms.items():
+            merged = {}
+            for snapshot in snapshots:
+                for endpoint, series in snapshot.get(key, {}).items():
+                    total = merged.setdefault(endpoint, [0] * len(series))
+                    for i, value in enumerate(series):
+                        total[i] += value
+            lines.extend(histogram.render(merged))
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+
+def _state():
+    """Per-request counters, or None outside a request."""
+    if not has_request_context():
+        return None
+    return g.get('_metrics')
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _state() is not None:
+        conn.info.setdefault('_metrics_started', []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    state = _state()
+    if state is None:
+        return
+    started = conn.info.get('_metrics_started')
+    if not started:
+        return
+    elapsed = time.perf_counter() - started.pop()
+    state['queries'] += 1
+    state['sql_time'] += elapsed
+    if len(state['statements']) < MAX_STATEMENTS:
+        state['statements'].append((elapsed, statement))
+
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(exception_context):
+    connection = exception_context.connection
+    if connection is not None and connection.info.get('_metrics_started'):
+        connection.info['_metrics_started'].pop()
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _do_orm_execute(orm_execute_state):
+    state = _state()
+    if state is not None and orm_execute_state.is_relationship_load:
+        state['lazy_loads'] += 1
+
+
+def _before_render(sender, template, context, **extra):
+    state = _state()
+    if state is not None:
+        state['render_stack'].append(time.perf_counter())
+
+
+def _after_render(sender, template, context, **extra):
+    state = _state()
+    if state is None or not state['render_stack']:
+        return
+    started = state['render_stack'].pop()
+    # Nested renders (job cards inside a page) are already inside the outer one
+    if not state['render_stack']:
+        state['render_time'] += time.perf_counter() - started
+
+
+def _start_request():
+    g._metrics = {'started': time.perf_counter(), 'queries': 0, 'sql_time': 0.0, 'lazy_loads': 0,
+                  'render_time': 0.0, 'render_stack': [], 'statements': [], 'size': None, 'status': None}
+
+
+def _record_response(response):
+    state = _state()
+    if state is not None:
+        state['size'] = None if response.is_streamed else response.calculate_content_length()
+        state['status'] = response.status_code
+    return response
+
+
+def _finish_request(exception, app):
+    # Teardown runs even when the view raised, so failed requests are measured too
+    state = g.pop('_metrics', None)
+    if state is None or request.endpoint == 'metrics':
+        return
+    duration = time.perf_counter() - state['started']
+    endpoint = request.endpoint or 'unmatched'
+    size = state['size']
+    status = 500 if exception is not None else state['status']
+    registry.observe(endpoint, {
+        'duration': duration,
+        'sql_time': state['sql_time'],
+        'queries': state['queries'],
+        'lazy_loads': state['lazy_loads'],
+        'render_time': state['render_time'],
+        'size': size,
+    })
+
+    if duration >= app.config['SLOW_REQUEST_SECONDS']:
+        slowest = sorted(state['statements'], key=lambda item: item[0], reverse=True)[:SLOW_STATEMENTS_LOGGED]
+        logger.warning(
+            "slow request %s %s endpoint=%s status=%s total=%.3fs sql=%.3fs queries=%d lazy_loads=%d render=%.3fs%s",
+            request.method, request.path, endpoint, status, duration, state['sql_time'], state['queries'],
+            state['lazy_loads'], state['render_time'],
+            "".join(f"\n  {elapsed * 1000:.1f} ms  {' '.join(statement.split())[:500]}" for elapsed, statement in slowest))
+
+    metrics_dir = app.config['METRICS_DIR']
+    if metrics_dir and time.monotonic() - registry.snapshot_at > SNAPSHOT_INTERVAL:
+        registry.snapshot_at = time.monotonic()
+        _write_snapshot(metrics_dir)
+
+
+def _write_snapshot(metrics_dir):
+    path = os.path.join(metrics_dir, f"metrics-{os.getpid()}.json")
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(registry.snapshot(), f)
+    os.replace(tmp_path, path)
+
+
+def metrics_view(app):
+    metrics_dir = app.config['METRICS_DIR']
+    if not metrics_dir:
+        return Response(registry.render([registry.snapshot()]), mimetype='text/plain; version=0.0.4')
+
+    _write_snapshot(metrics_dir)
+    snapshots = []
+    for path in glob.glob(os.path.join(metrics_dir, "metrics-*.json")):
+        try:
+            with open(path, encoding='utf-8') as f:
+                snapshots.append(json.load(f))
+        except (OSError, ValueError):
+            continue
+    return Response(registry.render(snapshots), mimetype='text/plain; version=0.0.4')
+
+
+def init_app(app):
+    """Hook request, template and SQL instrumentation into ``app`` and add /metrics."""
+    app.config.setdefault('SLOW_REQUEST_SECONDS', float(os.getenv("SLOW_REQUEST_SECONDS", "0.5")))
+    app.config.setdefault('METRICS_DIR', os.getenv("METRICS_DIR"))
+    if app.config['METRICS_DIR']:
+        os.makedirs(app.config['METRICS_DIR'], exist_ok=True)
+
+    app.before_request(_start_request)
+    app.after_request(_record_response)
+    app.teardown_request(lambda exception: _finish_request(exception, app))
+    before_render_template.connect(_before_render, app)
+    template_rendered.connect(_after_render, app)
+    app.add_url_rule("/metrics", "metrics", lambda: metrics_view(app))
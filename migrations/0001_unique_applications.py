@@ -0,0 +1,28 @@
+"""One application per (job, applicant).
+
+Duplicate applications are merged into the oldest one: their messages
+move to it and the newer rows are deleted before the unique index goes on.
+"""
+import sqlalchemy as sa
+
+from migrations import create_index, has_index
+
+
+def upgrade(conn):
+    if has_index(conn, "application", "uq_application_job_applicant"):
+        return
+
+    duplicates = conn.execute(sa.text(
+        "SELECT job_id, applicant_id, MIN(id) FROM application "
+        "GROUP BY job_id, applicant_id HAVING COUNT(*) > 1")).all()
+    for job_id, applicant_id, keep_id in duplicates:
+        params = {'job_id': job_id, 'applicant_id': applicant_id, 'keep_id': keep_id}
+        conn.execute(sa.text(
+            "UPDATE message SET application_id = :keep_id WHERE application_id IN "
+            "(SELECT id FROM (SELECT id FROM application WHERE job_id = :job_id "
+            "AND applicant_id = :applicant_id AND id != :keep_id) AS merged)"), params)
+        conn.execute(sa.text(
+            "DELETE FROM application WHERE job_id = :job_id AND applicant_id = :applicant_id "
+            "AND id != :keep_id"), params)
+
+    create_index(conn, "application", "uq_application_job_applicant", ["job_id", "applicant_id"], unique=True)
@@ -0,0 +1,16 @@
+"""Composite indexes for the job feed, applications, chat threads and notifications."""
+from migrations import create_index
+
+INDEXES = [
+    ("job", "ix_job_posted_at_id", ["posted_at", "id"]),
+    ("job", "ix_job_user_id", ["user_id"]),
+    ("application", "ix_application_applicant_status", ["applicant_id", "status"]),
+    ("message", "ix_message_application_timestamp", ["application_id", "timestamp"]),
+    ("notification", "ix_notification_user_read", ["user_id", "is_read"]),
+    ("outbox_event", "ix_outbox_event_processed_at", ["processed_at", "id"]),
+]
+
+
+def upgrade(conn):
+    for table, name, columns in INDEXES:
+        create_index(conn, table, name, columns)
@@ -0,0 +1,13 @@
+"""Normalized job location: gazetteer place key and coordinates.
+
+Run ``flask backfill-locations`` afterwards to fill them in for existing jobs.
+"""
+import sqlalchemy as sa
+
+from migrations import add_column
+
+
+def upgrade(conn):
+    add_column(conn, "job", sa.Column("location_key", sa.String(50)))
+    add_column(conn, "job", sa.Column("latitude", sa.Float))
+    add_column(conn, "job", sa.Column("longitude", sa.Float))
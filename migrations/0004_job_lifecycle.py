@@ -0,0 +1,43 @@
+"""Job lifecycle: status, expiry and closing time, indexed so only open jobs are hot.
+
+Existing jobs stay open and get the default lifetime from their posting
+date, so the worker's first sweep expires the ones that are long past it.
+"""
+from datetime import timedelta
+
+import sqlalchemy as sa
+
+from migrations import add_column, create_index, drop_index
+
+JOB_LIFETIME_DAYS = 30  # lifecycle.JOB_LIFETIME_DAYS when this migration was written
+BATCH = 1000
+
+
+def upgrade(conn):
+    add_column(conn, "job", sa.Column("status", sa.Enum('open', 'filled', 'expired', 'deleted'),
+                                      nullable=False, server_default='open'))
+    add_column(conn, "job", sa.Column("expires_at", sa.DateTime))
+    add_column(conn, "job", sa.Column("closed_at", sa.DateTime))
+
+    job = sa.Table("job", sa.MetaData(), autoload_with=conn)
+    last_id = 0
+    while True:
+        rows = conn.execute(sa.select(job.c.id, job.c.posted_at)
+                            .where(job.c.id > last_id, job.c.expires_at.is_(None))
+                            .order_by(job.c.id)
+                            .limit(BATCH)).all()
+        if not rows:
+            break
+        expiries = [{'job_id': row.id, 'expiry': row.posted_at + timedelta(days=JOB_LIFETIME_DAYS)}
+                    for row in rows if row.posted_at is not None]
+        if expiries:
+            conn.execute(job.update()
+                         .where(job.c.id == sa.bindparam('job_id'))
+                         .values(expires_at=sa.bindparam('expiry')), expiries)
+        last_id = rows[-1].id
+
+    create_index(conn, "job", "ix_job_status_posted_at_id", ["status", "posted_at", "id"])
+    create_index(conn, "job", "ix_job_status_expires_at", ["status", "expires_at"])
+    create_index(conn, "job", "ix_job_closed_at", ["closed_at"])
+    # Superseded by ix_job_status_posted_at_id, which the feed now uses
+    drop_index(conn, "job", "ix_job_posted_at_id")
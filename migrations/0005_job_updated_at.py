@@ -0,0 +1,15 @@
+"""Job change time, so web workers can re-index jobs edited or closed by other processes.
+
+Existing jobs keep a NULL updated_at until they next change; a worker loads
+them on startup anyway. The closed_at index goes: workers now follow
+updated_at, which closings also set.
+"""
+import sqlalchemy as sa
+
+from migrations import add_column, create_index, drop_index
+
+
+def upgrade(conn):
+    add_column(conn, "job", sa.Column("updated_at", sa.DateTime))
+    create_index(conn, "job", "ix_job_updated_at", ["updated_at"])
+    drop_index(conn, "job", "ix_job_closed_at")
@@ -0,0 +1,18 @@
+"""Unread notification counters for the notifications that predate them.
+
+The badge reads notification_counter, which only the worker's new
+notifications bump; this fills in every user's existing unread count.
+Users that already have a counter keep it.
+"""
+import sqlalchemy as sa
+
+
+def upgrade(conn):
+    metadata = sa.MetaData()
+    notification = sa.Table("notification", metadata, autoload_with=conn)
+    counter = sa.Table("notification_counter", metadata, autoload_with=conn)
+    unread = (sa.select(notification.c.user_id, sa.func.count())
+              .where(notification.c.is_read == sa.false(),
+                     ~sa.exists().where(counter.c.user_id == notification.c.user_id))
+              .group_by(notification.c.user_id))
+    conn.execute(counter.insert().from_select(["user_id", "unread"], unread))
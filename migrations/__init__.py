@@ -0,0 +1,100 @@
+"""Numbered schema migrations.
+
+Each ``NNNN_name.py`` module in this package has an ``upgrade(conn)``
+function. ``flask upgrade-db`` creates any missing tables from the models,
+then runs the migrations newer than the version recorded in the
+``schema_version`` table, in order, each in its own transaction.
+
+Tables created from the models already have the latest shape, so every
+migration checks what exists before changing it and is safe to run twice.
+"""
+import importlib
+import os
+import re
+from datetime import datetime
+
+import sqlalchemy as sa
+
+MIGRATION_RE = re.compile(r"^(\d{4})_(\w+)\.py$")
+
+schema_version = sa.Table(
+    "schema_version", sa.MetaData(),
+    sa.Column("version", sa.Integer, primary_key=True, autoincrement=False),
+    sa.Column("name", sa.String(100), nullable=False),
+    sa.Column("applied_at", sa.DateTime, nullable=False),
+)
+
+
+def discover():
+    """Return ``[(version, name, module)]`` for the migrations here, in order."""
+    found = []
+    for filename in sorted(os.listdir(os.path.dirname(__file__))):
+        match = MIGRATION_RE.match(filename)
+        if match:
+            module = importlib.import_module(f"{__name__}.{filename[:-3]}")
+            found.append((int(match.group(1)), match.group(2), module))
+    return found
+
+
+def current_version(conn):
+    schema_version.create(conn, checkfirst=True)
+    return conn.execute(sa.select(sa.func.max(schema_version.c.version))).scalar() or 0
+
+
+def upgrade(engine, log=print):
+    """Apply the pending migrations to ``engine`` and return their versions."""
+    with engine.begin() as conn:
+        current = current_version(conn)
+    applied = []
+    for version, name, module in discover():
+        if version <= current:
+            continue
+        log(f"applying {version:04d}_{name}")
+        with engine.begin() as conn:
+            module.upgrade(conn)
+            conn.execute(schema_version.insert().values(version=version, name=name, applied_at=datetime.utcnow()))
+        applied.append(version)
+    return applied
+
+
+# Helpers for migrations
+
+def has_index(conn, table, name):
+    inspector = sa.inspect(conn)
+    return (any(index['name'] == name for index in inspector.get_indexes(table))
+            or any(constraint['name'] == name for constraint in inspector.get_unique_constraints(table)))
+
+
+def has_column(conn, table, name):
+    return any(column['name'] == name for column in sa.inspect(conn).get_columns(table))
+
+
+def create_index(conn, table, name, columns, unique=False):
+    """Create an index unless one with this name exists."""
+    if has_index(conn, table, name):
+        return
+    reflected = sa.Table(table, sa.MetaData(), autoload_with=conn)
+    sa.Index(name, *[reflected.c[column] for column in columns], unique=unique).create(conn)
+
+
+def drop_index(conn, table, name):
+    """Drop an index if it exists."""
+    reflected = sa.Table(table, sa.MetaData(), autoload_with=conn)
+    for index in reflected.indexes:
+        if index.name == name:
+            index.drop(conn)
+
+
+def add_column(conn, table, column):
+    """Add ``column`` (an unbound sa.Column) to ``table`` unless it exists.
+
+    A NOT NULL column needs a string ``server_default``, which existing rows get.
+    """
+    if has_column(conn, table, column.name):
+        return
+    ddl = f"ALTER TABLE {table} ADD COLUMN {column.name} {column.type.compile(dialect=conn.dialect)}"
+    if column.server_default is not None:
+        ddl += " DEFAULT '%s'" % column.server_default.arg.replace("'", "''")
+    if not column.nullable:
+        ddl += " NOT NULL"
+    conn.execute(sa.text(ddl))
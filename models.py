@@ -0,0 +1,109 @@
+from flask_sqlalchemy import SQLAlchemy
+from datetime import datetime
+from dbrouting import RoutingSession
+
+db = SQLAlchemy(session_options={'class_': RoutingSession})
+
+# Database Models
+class User(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), nullable=False)
+    mobile = db.Column(db.String(15), unique=True, nullable=False)
+    password = db.Column(db.String(100), nullable=False)
+    role = db.Column(db.Enum('employee', 'employer'), nullable=False)
+
+class Job(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    title = db.Column(db.String(100), nullable=False)
+    description = db.Column(db.Text, nullable=False)
+    company = db.Column(db.String(100), nullable=False)
+    location = db.Column(db.String(100), nullable=False)
+    # Gazetteer place the location resolved to (see places.py); None if unknown
+    location_key = db.Column(db.String(50))
+    latitude = db.Column(db.Float)
+    longitude = db.Column(db.Float)
+    posted_at = db.Column(db.DateTime, default=datetime.utcnow)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    # Lifecycle (see lifecycle.py): only open jobs are listed and searched
+    status = db.Column(db.Enum('open', 'filled', 'expired', 'deleted'), nullable=False, default='open',
+                       server_default='open')
+    expires_at = db.Column(db.DateTime)
+    closed_at = db.Column(db.DateTime)  # when the job stopped being open
+    # Set on every change, so web workers can re-index jobs edited or closed elsewhere
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    applications = db.relationship('Application', backref='job', lazy=True)
+
+    __table_args__ = (
+        db.Index('ix_job_status_posted_at_id', 'status', 'posted_at', 'id'),  # job feed keyset order
+        db.Index('ix_job_status_expires_at', 'status', 'expires_at'),  # expiry sweep
+        db.Index('ix_job_updated_at', 'updated_at'),  # workers catching up on changed jobs
+        db.Index('ix_job_user_id', 'user_id'),
+    )
+
+class Application(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    job_id = db.Column(db.Integer, db.ForeignKey('job.id'), nullable=False)
+    applicant_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    status = db.Column(db.Enum('pending', 'approved', 'rejected'), default='pending')
+    message = db.Column(db.Text)
+    email = db.Column(db.String(100), nullable=False)
+    phone = db.Column(db.String(15), nullable=False)
+    applicant = db.relationship('User', backref='applications')
+
+    __table_args__ = (
+        # One application per job and applicant; also serves lookups by job_id
+        db.UniqueConstraint('job_id', 'applicant_id', name='uq_application_job_applicant'),
+        db.Index('ix_application_applicant_status', 'applicant_id', 'status'),
+    )
+
+class Message(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    application_id = db.Column(db.Integer, db.ForeignKey('application.id'), nullable=False)
+    sender_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    content = db.Column(db.Text, nullable=False)
+    timestamp = db.Column(db.DateTime, default=datetime.utcnow)
+    application = db.relationship('Application', backref='messages')
+    sender = db.relationship('User', backref='messages')
+
+    __table_args__ = (
+        db.Index('ix_message_application_timestamp', 'application_id', 'timestamp'),
+    )
+
+class MessageArchive(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    application_id = db.Column(db.Integer, db.ForeignKey('application.id'), nullable=False)
+    first_message_id = db.Column(db.Integer, nullable=False)
+    last_message_id = db.Column(db.Integer, nullable=False)
+    message_count = db.Column(db.Integer, nullable=False)
+    payload = db.Column(db.LargeBinary(16 * 1024 * 1024), nullable=False)  # zlib-compressed JSON
+    archived_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.Index('ix_message_archive_application', 'application_id'),
+    )
+
+class Notification(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    message = db.Column(db.Text, nullable=False)
+    timestamp = db.Column(db.DateTime, default=datetime.utcnow)
+    is_read = db.Column(db.Boolean, default=False)
+
+    __table_args__ = (
+        db.Index('ix_notification_user_read', 'user_id', 'is_read'),
+    )
+
+class OutboxEvent(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(50), nullable=False)
+    payload = db.Column(db.Text, nullable=False)  # JSON
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    processed_at = db.Column(db.DateTime, nullable=True)
+
+    __table_args__ = (
+        db.Index('ix_outbox_event_processed_at', 'processed_at', 'id'),
+    )
+
+class NotificationCounter(db.Model):
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    unread = db.Column(db.Integer, nullable=False, default=0)
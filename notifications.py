@@ -0,0 +1,135 @@
+import json
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert
+from sqlalchemy.orm import joinedload
+
+from models import db, Application, Message, Notification, NotificationCounter, OutboxEvent
+
+# Outbox event kinds and the translation keys used to render them
+DECISIONS = {
+    'application.approved': ('application_approved_message', 'Your application has been approved.',
+                             'application_approved_notification', 'has_been_approved', 'has been approved.'),
+    'application.rejected': ('application_rejected_message', 'Your application has been rejected.',
+                             'application_rejected_notification', 'has_been_rejected', 'has been rejected.'),
+}
+
+
+def enqueue(kind, **payload):
+    """Add an outbox event to the current transaction; the worker delivers it after commit."""
+    db.session.add(OutboxEvent(kind=kind, payload=json.dumps(payload)))
+
+
+def enqueue_many(kind, payloads):
+    """Add one outbox event per payload with a single multi-row INSERT."""
+    if payloads:
+        now = datetime.utcnow()
+        db.session.execute(insert(OutboxEvent), [
+            {'kind': kind, 'payload': json.dumps(payload), 'created_at': now} for payload in payloads])
+
+
+def unread_count(user_id):
+    """Unread notifications of a user, read from the denormalized counter row."""
+    counter = db.session.get(NotificationCounter, user_id)
+    return counter.unread if counter else 0
+
+
+def mark_all_read(user_id):
+    """Mark every notification of a user read and reset the counter."""
+    Notification.query.filter_by(user_id=user_id, is_read=False).update({'is_read': True})
+    NotificationCounter.query.filter_by(user_id=user_id).update({'unread': 0})
+
+
+def drain_outbox(translations, batch_size=500, on_notified=None):
+    """Deliver one batch of pending outbox events. Returns how many were processed.
+
+    Each batch is one transaction: the chat messages and notifications are
+    inserted with multi-row INSERTs, duplicate notifications for the same
+    application collapse into the latest decision, and the per-user unread
+    counters are bumped once per user. After the commit ``on_notified`` is
+    called with ``{user_id: new notifications}``.
+    """
+    events = (OutboxEvent.query
+              .filter(OutboxEvent.processed_at.is_(None))
+              .order_by(OutboxEvent.id)
+              .limit(batch_size)
+              .with_for_update(skip_locked=True)
+              .all())
+    if not events:
+        return 0
+
+    payloads = [(event, json.loads(event.payload)) for event in events]
+    application_ids = {payload['application_id'] for event, payload in payloads if event.kind in DECISIONS}
+    applications = {}
+    if application_ids:
+        applications = {application.id: application for application in Application.query
+                        .options(joinedload(Application.job))
+                        .filter(Application.id.in_(application_ids))}
+
+    now = datetime.utcnow()
+    messages = []
+    latest_notification = {}
+    for event, payload in payloads:
+        application = applications.get(payload.get('application_id'))
+        if event.kind not in DECISIONS or application is None:
+            continue
+        message_key, message_default, notification_key, suffix_key, suffix_default = DECISIONS[event.kind]
+        text = translations.get(payload.get('language', 'en'), {})
+
+        # Default message from the employer to the employee
+        messages.append({
+            'application_id': application.id,
+            'sender_id': payload['employer_id'],
+            'content': text.get(message_key, message_default),
+            'timestamp': now,
+        })
+        # Only the last decision on an application in this batch is notified
+        latest_notification[application.id] = {
+            'user_id': application.applicant_id,
+            'message': f"{text.get(notification_key, 'Your application for job:')} {application.job.title} {text.get(suffix_key, suffix_default)}",
+            'timestamp': now,
+            'is_read': False,
+        }
+
+    if messages:
+        db.session.execute(insert(Message), messages)
+    notifications = list(latest_notification.values())
+    increments = {}
+    if notifications:
+        db.session.execute(insert(Notification), notifications)
+        increments = _bump_counters(notifications)
+
+    for event in events:
+        event.processed_at = now
+    db.session.commit()
+    if increments and on_notified is not None:
+        on_notified(increments)
+    return len(events)
+
+
+def _bump_counters(notifications):
+    increments = {}
+    for notification in notifications:
+        increments[notification['user_id']] = increments.get(notification['user_id'], 0) + 1
+    counters = {counter.user_id: counter for counter in NotificationCounter.query
+                .filter(NotificationCounter.user_id.in_(increments))
+                .with_for_update()}
+    for user_id, increment in increments.items():
+        if user_id in counters:
+            counters[user_id].unread += increment
+        else:
+            db.session.add(NotificationCounter(user_id=user_id, unread=increment))
+    return increments
+
+
+def purge_processed(older_than=timedelta(days=1), batch_size=5000):
+    """Delete delivered outbox events older than ``older_than``, one batch at a time."""
+    cutoff = datetime.utcnow() - older_than
+    ids = [row.id for row in (OutboxEvent.query
+                              .with_entities(OutboxEvent.id)
+                              .filter(OutboxEvent.processed_at < cutoff)
+                              .limit(batch_size))]
+    if ids:
+        OutboxEvent.query.filter(OutboxEvent.id.in_(ids)).delete(synchronize_session=False)
+        db.session.commit()
+    return len(ids)
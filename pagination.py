@@ -0,0 +1,186 @@
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+
+from itsdangerous import BadSignature, URLSafeSerializer
+from sqlalchemy import and_, or_
+
+FILTER_NAMES = ('filter_title', 'filter_location', 'filter_date', 'filter_radius')
+
+
+class KeysetPage:
+    """One page of a keyset-paginated feed.
+
+    ``next_cursor``/``prev_cursor`` are opaque tokens that carry the sort key
+    of the boundary item plus the active filters, so following a link needs
+    neither an OFFSET nor the original query string.
+    """
+
+    def __init__(self, items, next_key=None, prev_key=None, total=None):
+        self.items = items
+        self.next_key = next_key
+        self.prev_key = prev_key
+        self.total = total
+        self.next_cursor = None
+        self.prev_cursor = None
+
+    @property
+    def has_next(self):
+        return self.next_key is not None
+
+    @property
+    def has_prev(self):
+        return self.prev_key is not None
+
+    def __iter__(self):
+        return iter(self.items)
+
+
+class CursorCodec:
+    """Sign and encode feed cursors so clients can't forge arbitrary keys."""
+
+    def __init__(self, secret_key, salt='job-feed-cursor'):
+        self._serializer = URLSafeSerializer(secret_key, salt=salt)
+
+    def encode(self, filters, key, direction):
+        return self._serializer.dumps({'f': [filters.get(name, '') for name in FILTER_NAMES],
+                                       'k': list(key), 'd': direction})
+
+    def decode(self, token):
+        """Return ``(filters, key, direction)``, or None for a missing or bad token."""
+        if not token:
+            return None
+        try:
+            data = self._serializer.loads(token)
+            filters = dict.fromkeys(FILTER_NAMES, '')
+            filters.update(zip(FILTER_NAMES, data['f']))
+            return filters, tuple(data['k']), data['d']
+        except (BadSignature, KeyError, TypeError, ValueError):
+            return None
+
+
+def feed_key(job):
+    """Sort key of a job in the newest-first feed."""
+    return (job.posted_at.isoformat() if job.posted_at else '', job.id)
+
+
+def paginate_feed(query, model, key=None, direction='next', per_page=10):
+    """Keyset-paginate ``query`` newest first on ``(posted_at, id)``.
+
+    Each page is a single indexed range scan of ``per_page + 1`` rows, however
+    deep the user has scrolled.
+    """
+    posted_at, row_id = model.posted_at, model.id
+    if key is not None:
+        key_posted_at = datetime.fromisoformat(key[0]) if key[0] else None
+        key_id = int(key[1])
+        if direction == 'prev':
+            query = query.filter(or_(posted_at > key_posted_at,
+                                     and_(posted_at == key_posted_at, row_id > key_id)))
+        else:
+            query = query.filter(or_(posted_at < key_posted_at,
+                                     and_(posted_at == key_posted_at, row_id < key_id)))
+
+    if direction == 'prev':
+        rows = query.order_by(posted_at.asc(), row_id.asc()).limit(per_page + 1).all()
+        more = len(rows) > per_page
+        items = list(reversed(rows[:per_page]))
+        has_prev, has_next = more, key is not None
+    else:
+        rows = query.order_by(posted_at.desc(), row_id.desc()).limit(per_page + 1).all()
+        more = len(rows) > per_page
+        items = rows[:per_page]
+        has_prev, has_next = key is not None, more
+
+    if not items:
+        return KeysetPage([])
+    return KeysetPage(items,
+                      next_key=feed_key(items[-1]) if has_next else None,
+                      prev_key=feed_key(items[0]) if has_prev else None)
+
+
+
+def paginate_by_id(query, column, before=None, after=None, per_page=20):
+    """Keyset-paginate ``query`` newest first on a single integer ``column``.
+
+    ``before`` moves to older rows, ``after`` back to newer ones. Page keys
+    are the boundary ids.
+    """
+    if after is not None:
+        rows = query.filter(column > after).order_by(column.asc()).limit(per_page + 1).all()
+        items = list(reversed(rows[:per_page]))
+        has_prev, has_next = len(rows) > per_page, True
+    else:
+        if before is not None:
+            query = query.filter(column < before)
+        rows = query.order_by(column.desc()).limit(per_page + 1).all()
+        items = rows[:per_page]
+        has_prev, has_next = before is not None, len(rows) > per_page
+
+    if not items:
+        return KeysetPage([])
+    key = column.key
+    return KeysetPage(items,
+                      next_key=getattr(items[-1], key) if has_next else None,
+                      prev_key=getattr(items[0], key) if has_prev else None)
+
+def paginate_hits(hits, key=None, direction='next', per_page=10):
+    """Keyset-paginate ranked search hits on ``(score, job_id)``.
+
+    Returns a page whose ``items`` are job ids; the caller loads just those.
+    """
+    # hits are sorted by (-score, -job_id); bisect on the same ordering
+    ordering = [(-score, -job_id) for score, job_id in hits]
+    if key is None:
+        start = 0
+        end = per_page
+    elif direction == 'prev':
+        end = bisect_left(ordering, (-float(key[0]), -int(key[1])))
+        start = max(end - per_page, 0)
+    else:
+        start = bisect_right(ordering, (-float(key[0]), -int(key[1])))
+        end = start + per_page
+
+    page = hits[start:end]
+    if not page:
+        return KeysetPage([], total=len(hits))
+    has_prev = start > 0
+    has_next = end < len(hits)
+    return KeysetPage([job_id for _, job_id in page],
+                      next_key=(page[-1][0], page[-1][1]) if has_next else None,
+                      prev_key=(page[0][0], page[0][1]) if has_prev else None,
+                      total=len(hits))
+
+
+class CountCache:
+    """Cache approximate result counts per filter set for ``ttl`` seconds."""
+
+    def __init__(self, ttl=60, max_entries=1024):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = {}
+
+    def get(self, key, compute):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] > now:
+                return entry[0]
+        value = compute()
+        with self._lock:
+            if len(self._entries) >= self.max_entries:
+                self._entries = {k: v for k, v in self._entries.items() if v[1] > now}
+                if len(self._entries) >= self.max_entries:
+                    self._entries.clear()
+            self._entries[key] = (value, now + self.ttl)
+        return value
+
+    def discard(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
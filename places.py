@@ -0,0 +1,166 @@
+import json
+import math
+import os
+import threading
+from collections import namedtuple
+
+from search import tokenize
+
+# Tamil Nadu gazetteer: every district (its entry sits on the district
+# headquarters) and the larger towns, with Tamil and English spellings.
+# Free-text job locations are matched against it so "Madurai",
+# "madurai dist." and "மதுரையில்" all land on the same place.
+
+GAZETTEER_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "gazetteer.json")
+RADIUS_CHOICES = (10, 25, 50, 100)  # km, offered in the job filter
+GRID_DEGREES = 0.25  # grid cell size, about 27 km
+EARTH_RADIUS_KM = 6371.0
+MAX_ALIAS_TOKENS = 3
+
+Place = namedtuple('Place', 'key kind en ta district lat lon')
+
+
+def distance_km(lat1, lon1, lat2, lon2):
+    """Great-circle distance in kilometres."""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    a = (math.sin((phi2 - phi1) / 2) ** 2
+         + math.cos(phi1) * math.cos(phi2) * math.sin(math.radians(lon2 - lon1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+class GridIndex:
+    """Points bucketed into lat/lon cells; radius queries only visit nearby cells."""
+
+    def __init__(self, cell=GRID_DEGREES):
+        self.cell = cell
+        self._cells = {}
+
+    def add(self, key, lat, lon):
+        self._cells.setdefault((math.floor(lat / self.cell), math.floor(lon / self.cell)), []).append((key, lat, lon))
+
+    def within(self, lat, lon, km):
+        """Return ``[(distance, key)]`` of the points within ``km`` of (lat, lon), nearest first."""
+        dlat = km / 111.0
+        dlon = km / (111.0 * max(math.cos(math.radians(lat)), 0.01))
+        found = []
+        for row in range(math.floor((lat - dlat) / self.cell), math.floor((lat + dlat) / self.cell) + 1):
+            for col in range(math.floor((lon - dlon) / self.cell), math.floor((lon + dlon) / self.cell) + 1):
+                for key, point_lat, point_lon in self._cells.get((row, col), ()):
+                    distance = distance_km(lat, lon, point_lat, point_lon)
+                    if distance <= km:
+                        found.append((distance, key))
+        found.sort()
+        return found
+
+
+class Gazetteer:
+    def __init__(self, entries):
+        self.places = {}
+        self._aliases = {}  # tuple of index terms -> place key
+        self._towns = {}  # district key -> keys of the places in it
+        self._grid = GridIndex()
+        for entry in entries:
+            place = Place(entry['key'], entry['kind'], entry['en'], entry['ta'], entry['district'],
+                          entry['lat'], entry['lon'])
+            self.places[place.key] = place
+            self._towns.setdefault(place.district, []).append(place.key)
+            self._grid.add(place.key, place.lat, place.lon)
+            for name in [place.key, place.en, place.ta] + entry['aliases']:
+                terms = tuple(tokenize(name))
+                if terms and terms[0] == 'the':
+                    terms = terms[1:]
+                if terms:
+                    self._aliases.setdefault(terms, place.key)
+
+    @classmethod
+    def load(cls, path=GAZETTEER_PATH):
+        with open(path, encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    def resolve(self, text):
+        """Return the place named in free text, or None.
+
+        The longest alias wins, then a town over a district, so
+        "Hosur, Krishnagiri Dt." resolves to Hosur.
+        """
+        terms = tokenize(text)
+        best = None
+        for start in range(len(terms)):
+            for length in range(min(MAX_ALIAS_TOKENS, len(terms) - start), 0, -1):
+                key = self._aliases.get(tuple(terms[start:start + length]))
+                if key is None:
+                    continue
+                rank = (length, self.places[key].kind == 'town')
+                if best is None or rank > best[0]:
+                    best = (rank, key)
+                break
+        return self.places[best[1]] if best else None
+
+    def locate(self, text):
+        """Return ``(location_key, latitude, longitude)`` for a job location, all None if unknown."""
+        place = self.resolve(text) if text else None
+        if place is None:
+            return None, None, None
+        return place.key, place.lat, place.lon
+
+    def nearby(self, place, km=None):
+        """Keys of the places a location filter covers.
+
+        With a radius, every place within ``km`` of ``place``; without one,
+        the place itself, plus its towns when it is a district.
+        """
+        if km:
+            return [key for _, key in self._grid.within(place.lat, place.lon, km)]
+        if place.kind == 'district':
+            return list(self._towns.get(place.key, [place.key]))
+        return [place.key]
+
+
+_gazetteer = None
+_gazetteer_lock = threading.Lock()
+
+
+def gazetteer():
+    """The gazetteer loaded from gazetteer.json, read once per process."""
+    global _gazetteer
+    if _gazetteer is None:
+        with _gazetteer_lock:
+            if _gazetteer is None:
+                _gazetteer = Gazetteer.load()
+    return _gazetteer
+
+
+class JobLocations:
+    """Jobs grouped by normalized place, for location and radius filters."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._by_place = {}  # place key -> {job_id: posted_at}
+        self._place_of = {}  # job_id -> place key
+
+    def add(self, job_id, location_key, posted_at):
+        with self._lock:
+            self._remove(job_id)
+            if location_key:
+                self._by_place.setdefault(location_key, {})[job_id] = posted_at
+                self._place_of[job_id] = location_key
+
+    def remove(self, job_id):
+        with self._lock:
+            self._remove(job_id)
+
+    def _remove(self, job_id):
+        key = self._place_of.pop(job_id, None)
+        if key is not None:
+            self._by_place[key].pop(job_id, None)
+
+    def place_of(self, job_id):
+        return self._place_of.get(job_id)
+
+    def jobs_in(self, keys):
+        """Return ``{job_id: posted_at}`` for the jobs at any of ``keys``."""
+        with self._lock:
+            jobs = {}
+            for key in keys:
+                jobs.update(self._by_place.get(key, {}))
+            return jobs
@@ -0,0 +1,111 @@
+"""EXPLAIN the hot queries and report any that scan a whole table.
+
+    flask check-query-plans
+
+The statements mirror the ones the job feed, application pages, chat and
+the worker issue. SQLite plans come from EXPLAIN QUERY PLAN, MySQL
+plans from EXPLAIN; a full scan is ``SCAN <table>`` without an index on
+SQLite and access type ``ALL`` on MySQL.
+"""
+import re
+from datetime import datetime
+
+from sqlalchemy import and_, func, or_, select
+
+from models import Application, Job, Message, MessageArchive, Notification, OutboxEvent
+
+SQLITE_FULL_SCAN_RE = re.compile(r"^SCAN (?:TABLE )?(\w+)(?: AS \w+)?$")
+
+
+def hot_queries():
+    """Return ``{name: statement}`` for the queries that must use an index."""
+    key_posted_at = datetime(2024, 1, 1)
+    return {
+        'job_feed': (select(Job)
+                     .where(Job.status == 'open')
+                     .order_by(Job.posted_at.desc(), Job.id.desc())
+                     .limit(11)),
+        'job_feed_next_page': (select(Job)
+                               .where(Job.status == 'open',
+                                      or_(Job.posted_at < key_posted_at,
+                                          and_(Job.posted_at == key_posted_at, Job.id < 1000)))
+                               .order_by(Job.posted_at.desc(), Job.id.desc())
+                               .limit(11)),
+        'job_count': select(func.count()).select_from(Job).where(Job.status == 'open'),
+        'employer_jobs': (select(Job)
+                          .where(Job.user_id == 1, Job.status != 'deleted')
+                          .order_by(Job.id.desc())
+                          .limit(21)),
+        'jobs_changed_since': select(Job).where(Job.updated_at >= key_posted_at),
+        'job_expiry_sweep': (select(Job.id)
+                             .where(Job.status == 'open', Job.expires_at < key_posted_at)
+                             .order_by(Job.expires_at)
+                             .limit(1000)),
+        'deleted_jobs': (select(Job.id)
+                         .where(Job.status == 'deleted')
+                         .order_by(Job.id)
+                         .limit(10)),
+        'job_purge_applications': select(Application.id).where(Application.job_id == 1).limit(500),
+        'applied_badges': (select(Application.job_id)
+                           .where(Application.applicant_id == 1, Application.job_id.in_([1, 2, 3]))),
+        'approved_jobs': (select(Application)
+                          .where(Application.applicant_id == 1, Application.status == 'approved')
+                          .order_by(Application.id.desc())),
+        'employer_applications': (select(Application)
+                                  .join(Job, Job.id == Application.job_id)
+                                  .where(Job.user_id == 1, Application.status == 'pending')
+                                  .order_by(Application.id.desc())
+                                  .limit(21)),
+        'message_counts': (select(Message.application_id, func.count(Message.id))
+                           .where(Message.application_id.in_([1, 2, 3]))
+                           .group_by(Message.application_id)),
+        'chat_thread': (select(Message)
+                        .where(Message.application_id == 1, Message.id < 1000)
+                        .order_by(Message.id.desc())
+                        .limit(51)),
+        'chat_archive': (select(MessageArchive)
+                         .where(MessageArchive.application_id == 1, MessageArchive.id < 1000)
+                         .order_by(MessageArchive.id.desc())
+                         .limit(1)),
+        'chat_poll': (select(Message)
+                      .where(Message.application_id == 1, Message.id > 100)
+                      .order_by(Message.id)
+                      .limit(100)),
+        'unread_notifications': (select(Notification)
+                                 .where(Notification.user_id == 1, Notification.is_read.is_(False))),
+        'outbox_pending': (select(OutboxEvent)
+                           .where(OutboxEvent.processed_at.is_(None))
+                           .order_by(OutboxEvent.id)
+                           .limit(500)),
+    }
+
+
+def explain(conn, statement):
+    """Return ``(plan lines, full-scan tables)`` for ``statement`` on ``conn``."""
+    sql = str(statement.compile(dialect=conn.dialect, compile_kwargs={'literal_binds': True}))
+    if conn.dialect.name == 'sqlite':
+        rows = conn.exec_driver_sql("EXPLAIN QUERY PLAN " + sql).all()
+        lines = [row[-1] for row in rows]
+        scans = [match.group(1) for match in map(SQLITE_FULL_SCAN_RE.match, lines) if match]
+    elif conn.dialect.name == 'mysql':
+        rows = conn.exec_driver_sql("EXPLAIN " + sql).mappings().all()
+        lines = [f"{row['table']}: type={row['type']} key={row['key']} rows={row['rows']}" for row in rows]
+        scans = [row['table'] for row in rows if row['type'] == 'ALL']
+    else:
+        raise RuntimeError(f"No query plan check for the {conn.dialect.name} dialect")
+    return lines, scans
+
+
+def check(engine, log=print):
+    """EXPLAIN every hot query; return the names of those with a full scan."""
+    failed = []
+    with engine.connect() as conn:
+        for name, statement in hot_queries().items():
+            lines, scans = explain(conn, statement)
+            status = "FULL SCAN of " + ", ".join(scans) if scans else "ok"
+            log(f"{name}: {status}")
+            for line in lines:
+                log(f"    {line}")
+            if scans:
+                failed.append(name)
+    return failed
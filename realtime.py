@@ -0,0 +1,96 @@
+import json
+import logging
+import threading
+import time
+
+logger = logging.getLogger("realtime")
+
+
+class ChatBroker:
+    """Wake up chat streams in this worker when a new message is written.
+
+    Channels are application ids. Only the id of the newest message is kept,
+    and only while somebody is listening, so an idle chat costs one dict
+    entry and a sleeping thread. Messages written by other processes are
+    found by ``poll(after_id)``, which a watcher thread calls every
+    ``poll_interval`` seconds while any stream is open: it returns
+    ``(new watermark, [(channel, message_id)])`` for the messages with ids
+    above ``after_id``, or just the current watermark when ``after_id`` is
+    None. One query per worker covers all of its streams.
+    """
+
+    def __init__(self, poll=None, poll_interval=2, overlap=50):
+        self._cond = threading.Condition()
+        self._latest = {}
+        self._listeners = {}
+        self._poll = poll
+        self.poll_interval = poll_interval
+        self.overlap = overlap  # ids re-read each poll, for commits that land out of id order
+        self._watching = False
+
+    def publish(self, channel, message_id):
+        """Record that ``message_id`` was written to ``channel``."""
+        with self._cond:
+            if channel not in self._listeners:
+                return
+            if message_id > self._latest.get(channel, 0):
+                self._latest[channel] = message_id
+                self._cond.notify_all()
+
+    def subscribe(self, channel):
+        """Start tracking ``channel``; call before the stream's first catch-up query."""
+        with self._cond:
+            self._listeners[channel] = self._listeners.get(channel, 0) + 1
+            if self._poll is None or self._watching:
+                return
+            self._watching = True
+        # The watermark is read before the stream catches up, so nothing
+        # committed in between is missed
+        try:
+            watermark, _ = self._poll(None)
+        except Exception:
+            with self._cond:
+                self._watching = False
+            raise
+        threading.Thread(target=self._watch, args=(watermark,), name="chat-watcher", daemon=True).start()
+
+    def unsubscribe(self, channel):
+        with self._cond:
+            self._listeners[channel] -= 1
+            if not self._listeners[channel]:
+                del self._listeners[channel]
+                self._latest.pop(channel, None)
+
+    def _watch(self, watermark):
+        while True:
+            time.sleep(self.poll_interval)
+            with self._cond:
+                if not self._listeners:
+                    self._watching = False
+                    return
+            try:
+                latest, found = self._poll(max(watermark - self.overlap, 0))
+            except Exception:
+                logger.exception("chat watcher poll failed")
+                continue
+            watermark = max(watermark, latest)
+            for channel, message_id in found:
+                self.publish(channel, message_id)
+
+    def wait(self, channel, after_id, timeout):
+        """Block until a message newer than ``after_id`` is published, or ``timeout``.
+
+        Returns True if there is something new to fetch.
+        """
+        with self._cond:
+            return self._cond.wait_for(lambda: self._latest.get(channel, 0) > after_id, timeout)
+
+
+def sse_event(data, event_id=None, event='message'):
+    """Format one Server-Sent Events frame."""
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event}")
+    lines.append(f"data: {json.dumps(data, ensure_ascii=False)}")
+    return "\n".join(lines) + "\n\n"
@@ -0,0 +1,229 @@
+import math
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from search import tokenize
+
+# Content-based recommendations. Each job is an L2-normalized vector of
+# field-weighted, log-scaled term frequencies over its title, description and
+# location; IDF is applied at query time so posting a job never rescales the
+# others. An employee's profile is the IDF-weighted sum of the jobs they
+# applied to, and a recommendation is a dot product against the postings of
+# the profile's strongest terms, done with NumPy over flat arrays. Filled
+# and expired jobs are no longer recommended, but their vectors are kept
+# (or rebuilt on demand) so they still shape their applicants' profiles.
+
+FIELD_WEIGHTS = {'title': 3.0, 'description': 1.0, 'location': 2.0}
+PROFILE_TERMS = 40  # strongest profile terms scored per request
+RECENCY_WEIGHT = 0.25  # share of the score that decays with the job's age
+RECENCY_HALF_LIFE_DAYS = 30.0
+COMPACT_RATIO = 0.25  # rebuild the arrays once this share of slots is deleted jobs
+CLOSED_VECTORS = 20000  # vectors of closed jobs kept for profiles, least recently used dropped first
+
+
+class _Postings:
+    """Slots and weights of the jobs containing one term.
+
+    New entries go to Python lists and are folded into the arrays on the
+    next read, so adding a job is O(terms) rather than O(postings).
+    """
+
+    __slots__ = ('slots', 'weights', 'new_slots', 'new_weights')
+
+    def __init__(self):
+        self.slots = np.zeros(0, dtype=np.int32)
+        self.weights = np.zeros(0, dtype=np.float32)
+        self.new_slots = []
+        self.new_weights = []
+
+    def arrays(self):
+        if self.new_slots:
+            self.slots = np.concatenate([self.slots, np.array(self.new_slots, dtype=np.int32)])
+            self.weights = np.concatenate([self.weights, np.array(self.new_weights, dtype=np.float32)])
+            self.new_slots, self.new_weights = [], []
+        return self.slots, self.weights
+
+
+class RecommendationIndex:
+    """In-memory job vectors and term postings for "Recommended for you"."""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._reset()
+        self._closed = OrderedDict()  # job_id -> (term ids, weights) of closed jobs
+        self.max_doc_id = 0
+        self.loaded = False
+
+    def _reset(self):
+        self._terms = {}  # term -> term id
+        self._postings = []  # term id -> _Postings
+        self._df = []  # term id -> live jobs containing it
+        self._slot_of = {}  # job_id -> slot
+        self._vectors = []  # slot -> (term ids, weights)
+        self._job_ids = np.zeros(1024, dtype=np.int64)
+        self._posted = np.zeros(1024, dtype=np.float64)  # posted_at as a Unix time
+        self._alive = np.zeros(1024, dtype=bool)
+        self._size = 0
+        self._dead = 0
+
+    def __len__(self):
+        return len(self._slot_of)
+
+    def add(self, job_id, title='', description='', location='', posted_at=None):
+        """Index a job, replacing any previous version of it."""
+        posted = posted_at.timestamp() if posted_at is not None else 0.0
+        with self._lock:
+            self._remove(job_id)
+            self._closed.pop(job_id, None)
+            term_ids, weights = self._vector(title, description, location)
+            self._insert(job_id, posted, term_ids, weights)
+            self.max_doc_id = max(self.max_doc_id, job_id)
+
+    def add_closed(self, job_id, title='', description='', location=''):
+        """Keep the vector of a closed job for profiles, without recommending it."""
+        with self._lock:
+            self._keep_closed(job_id, self._vector(title, description, location))
+
+    def close(self, job_id):
+        """Stop recommending a filled or expired job; it still counts in its applicants' profiles."""
+        with self._lock:
+            slot = self._slot_of.get(job_id)
+            if slot is not None:
+                self._keep_closed(job_id, self._vectors[slot])
+                self._remove(job_id)
+
+    def remove(self, job_id):
+        """Drop a job from the index."""
+        with self._lock:
+            self._remove(job_id)
+            self._closed.pop(job_id, None)
+
+    def _vector(self, title, description, location):
+        values = {'title': title, 'description': description, 'location': location}
+        counts = {}
+        for field, weight in FIELD_WEIGHTS.items():
+            for term in tokenize(values[field]):
+                counts[term] = counts.get(term, 0.0) + weight
+        term_ids = np.array([self._term_id(term) for term in counts], dtype=np.int32)
+        weights = np.array([1.0 + math.log(count) for count in counts.values()], dtype=np.float32)
+        if len(weights):
+            weights /= np.linalg.norm(weights)
+        return term_ids, weights
+
+    def _keep_closed(self, job_id, vector):
+        self._closed[job_id] = vector
+        self._closed.move_to_end(job_id)
+        if len(self._closed) > CLOSED_VECTORS:
+            self._closed.popitem(last=False)
+
+    def _term_id(self, term):
+        term_id = self._terms.get(term)
+        if term_id is None:
+            term_id = self._terms[term] = len(self._postings)
+            self._postings.append(_Postings())
+            self._df.append(0)
+        return term_id
+
+    def _insert(self, job_id, posted, term_ids, weights):
+        slot = self._size
+        if slot == len(self._alive):
+            self._job_ids = np.resize(self._job_ids, slot * 2)
+            self._posted = np.resize(self._posted, slot * 2)
+            self._alive = np.concatenate([self._alive, np.zeros(slot, dtype=bool)])
+        self._size += 1
+        self._job_ids[slot] = job_id
+        self._posted[slot] = posted
+        self._alive[slot] = True
+        self._slot_of[job_id] = slot
+        self._vectors.append((term_ids, weights))
+        for term_id, weight in zip(term_ids.tolist(), weights.tolist()):
+            postings = self._postings[term_id]
+            postings.new_slots.append(slot)
+            postings.new_weights.append(weight)
+            self._df[term_id] += 1
+
+    def _remove(self, job_id):
+        slot = self._slot_of.pop(job_id, None)
+        if slot is None:
+            return
+        # Postings keep the dead slot until the next compaction; scoring masks it
+        self._alive[slot] = False
+        for term_id in self._vectors[slot][0].tolist():
+            self._df[term_id] -= 1
+        self._dead += 1
+        if self._dead > 1000 and self._dead > COMPACT_RATIO * self._size:
+            self._compact()
+
+    def _compact(self):
+        live = [(job_id, self._posted[slot], self._vectors[slot]) for job_id, slot in self._slot_of.items()]
+        terms = self._terms
+        self._reset()
+        self._terms = terms
+        self._postings = [_Postings() for _ in terms]
+        self._df = [0] * len(terms)
+        for job_id, posted, (term_ids, weights) in live:
+            self._insert(job_id, posted, term_ids, weights)
+
+    def _idf(self, term_id, n_docs):
+        return math.log((1 + n_docs) / (1 + self._df[term_id])) + 1.0
+
+    def profile(self, job_ids, load_closed=None):
+        """Return ``{term id: weight}`` for the jobs an employee applied to.
+
+        ``load_closed(job_ids)`` returns ``{job_id: (title, description, location)}``
+        for applied jobs that are neither open nor among the kept closed vectors.
+        """
+        if load_closed is not None:
+            with self._lock:
+                missing = [job_id for job_id in job_ids if job_id not in self._slot_of and job_id not in self._closed]
+            if missing:
+                for job_id, texts in load_closed(missing).items():
+                    self.add_closed(job_id, *texts)
+        with self._lock:
+            n_docs = len(self._slot_of)
+            profile = {}
+            for job_id in job_ids:
+                slot = self._slot_of.get(job_id)
+                if slot is not None:
+                    vector = self._vectors[slot]
+                elif job_id in self._closed:
+                    vector = self._closed[job_id]
+                    self._closed.move_to_end(job_id)
+                else:
+                    continue
+                term_ids, weights = vector
+                for term_id, weight in zip(term_ids.tolist(), weights.tolist()):
+                    profile[term_id] = profile.get(term_id, 0.0) + weight * self._idf(term_id, n_docs)
+            return profile
+
+    def recommend(self, applied_job_ids, k=20, now=None, load_closed=None):
+        """Return up to ``k`` ``(score, job_id)`` pairs best first, excluding ``applied_job_ids``."""
+        applied_job_ids = set(applied_job_ids)
+        profile = self.profile(applied_job_ids, load_closed)
+        if not profile:
+            return []
+        strongest = sorted(profile.items(), key=lambda item: -item[1])[:PROFILE_TERMS]
+
+        with self._lock:
+            n_docs = len(self._slot_of)
+            size = self._size
+            scores = np.zeros(size, dtype=np.float64)
+            for term_id, weight in strongest:
+                slots, weights = self._postings[term_id].arrays()
+                scores[slots] += weight * self._idf(term_id, n_docs) * weights
+
+            scores *= self._alive[:size]
+            applied_slots = [self._slot_of[job_id] for job_id in applied_job_ids if job_id in self._slot_of]
+            scores[applied_slots] = 0.0
+            age_days = ((now or time.time()) - self._posted[:size]) / 86400.0
+            scores *= (1 - RECENCY_WEIGHT) + RECENCY_WEIGHT * np.exp2(-np.maximum(age_days, 0) / RECENCY_HALF_LIFE_DAYS)
+
+            candidates = np.flatnonzero(scores > 0)
+            if len(candidates) > k:
+                candidates = candidates[np.argpartition(-scores[candidates], k - 1)[:k]]
+            job_ids = self._job_ids[candidates]
+            order = np.lexsort((-job_ids, -scores[candidates]))
+            return [(float(scores[candidates[i]]), int(job_ids[i])) for i in order]
@@ -0,0 +1,178 @@
+import math
+import re
+import threading
+from bisect import bisect_left, insort
+
+# Latin letters/digits, or runs of the Tamil block. Tamil vowel signs and the
+# virama are combining marks, so a plain \w+ would split words apart.
+TOKEN_RE = re.compile(r"[0-9a-z]+|[\u0B80-\u0BFF]+")
+
+# Common Tamil case suffixes, longest first ("மதுரையில்" -> "மதுரை")
+# so inflected place names and titles land on the same term as their base form.
+TAMIL_SUFFIXES = ("த்தில்", "ுக்கு", "யில்", "வில்", "க்கு", "ிடம்", "ில்", "ின்", "ால்")
+
+# Field weights: a hit in the title counts for more than one in the description
+FIELD_WEIGHTS = {'title': 3.0, 'company': 1.5, 'location': 2.0, 'description': 1.0}
+KEYWORD_FIELDS = ('title', 'company', 'description')
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+
+def normalize_token(token):
+    """Reduce a token to the term stored in the index."""
+    if token[0] >= '\u0b80':
+        for suffix in TAMIL_SUFFIXES:
+            if token.endswith(suffix) and len(token) > len(suffix) + 1:
+                return token[:-len(suffix)]
+        return token
+    if len(token) > 4 and token.endswith('ies'):
+        return token[:-3] + 'y'
+    if len(token) > 3 and token.endswith('s') and not token.endswith('ss'):
+        return token[:-1]
+    return token
+
+
+def tokenize(text):
+    """Split Tamil/English text into normalized index terms."""
+    if not text:
+        return []
+    return [normalize_token(token) for token in TOKEN_RE.findall(text.casefold())]
+
+
+class SearchIndex:
+    """Inverted index over job title, description, company and location.
+
+    Postings are kept per field as ``term -> {job_id: term_frequency}``. Each
+    field also keeps a sorted vocabulary so query terms can match by prefix,
+    which is what users typing "elect" or "மதுரை" expect from a filter box.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._postings = {field: {} for field in FIELD_WEIGHTS}
+        self._vocab = {field: [] for field in FIELD_WEIGHTS}
+        self._docs = {}  # job_id -> (field terms, weighted length, posted_at)
+        self._total_length = 0.0
+        self.max_doc_id = 0
+        self.loaded = False
+
+    def __len__(self):
+        return len(self._docs)
+
+    def __contains__(self, job_id):
+        return job_id in self._docs
+
+    def add(self, job_id, title='', description='', company='', location='', posted_at=None):
+        """Index a job, replacing any previous version of it."""
+        values = {'title': title, 'description': description, 'company': company, 'location': location}
+        with self._lock:
+            self._remove(job_id)
+            terms = {}
+            length = 0.0
+            for field, weight in FIELD_WEIGHTS.items():
+                counts = {}
+                for term in tokenize(values[field]):
+                    counts[term] = counts.get(term, 0) + 1
+                postings = self._postings[field]
+                for term, tf in counts.items():
+                    if term not in postings:
+                        postings[term] = {}
+                        insort(self._vocab[field], term)
+                    postings[term][job_id] = tf
+                    length += weight * tf
+                terms[field] = tuple(counts)
+            self._docs[job_id] = (terms, length, posted_at)
+            self._total_length += length
+            self.max_doc_id = max(self.max_doc_id, job_id)
+
+    def terms(self, job_id):
+        """Return the set of index terms of a job, empty if it isn't indexed."""
+        with self._lock:
+            doc = self._docs.get(job_id)
+            return set().union(*doc[0].values()) if doc else set()
+
+    def remove(self, job_id):
+        """Drop a job from the index."""
+        with self._lock:
+            self._remove(job_id)
+
+    def _remove(self, job_id):
+        doc = self._docs.pop(job_id, None)
+        if doc is None:
+            return
+        terms, length, _ = doc
+        self._total_length -= length
+        for field, field_terms in terms.items():
+            postings = self._postings[field]
+            for term in field_terms:
+                docs = postings.get(term)
+                if docs is None:
+                    continue
+                docs.pop(job_id, None)
+                if not docs:
+                    del postings[term]
+                    vocab = self._vocab[field]
+                    i = bisect_left(vocab, term)
+                    if i < len(vocab) and vocab[i] == term:
+                        del vocab[i]
+
+    def _expand(self, field, term):
+        """Yield (index term, is exact match) for every term starting with ``term``."""
+        vocab = self._vocab[field]
+        i = bisect_left(vocab, term)
+        while i < len(vocab) and vocab[i].startswith(term):
+            yield vocab[i], vocab[i] == term
+            i += 1
+
+    def _match(self, fields, term, n_docs, avg_length):
+        """Score every job matching ``term`` in any of ``fields``."""
+        scores = {}
+        for field in fields:
+            weight = FIELD_WEIGHTS[field]
+            postings = self._postings[field]
+            for index_term, exact in self._expand(field, term):
+                docs = postings[index_term]
+                idf = math.log(1 + (n_docs - len(docs) + 0.5) / (len(docs) + 0.5))
+                if not exact:
+                    idf *= 0.5  # prefix hits rank below whole-word hits
+                for job_id, tf in docs.items():
+                    length = self._docs[job_id][1]
+                    tf_norm = tf * (K1 + 1) / (tf + K1 * (1 - B + B * length / avg_length))
+                    scores[job_id] = scores.get(job_id, 0.0) + weight * idf * tf_norm
+        return scores
+
+    def search(self, text='', location='', since=None):
+        """Return ``[(score, job_id), ...]`` best first.
+
+        Every term of ``text`` must appear in the title, company or description
+        and every term of ``location`` in the location. Work is proportional to
+        the postings touched, not to the number of indexed jobs.
+        """
+        clauses = [(KEYWORD_FIELDS, term) for term in dict.fromkeys(tokenize(text))]
+        clauses += [(('location',), term) for term in dict.fromkeys(tokenize(location))]
+        if not clauses:
+            return []
+
+        with self._lock:
+            n_docs = len(self._docs) or 1
+            avg_length = (self._total_length / n_docs) or 1.0
+            matches = [self._match(fields, term, n_docs, avg_length) for fields, term in clauses]
+            # Intersect starting from the rarest clause so the loop stays small
+            matches.sort(key=len)
+            results = []
+            for job_id, score in matches[0].items():
+                for other in matches[1:]:
+                    if job_id not in other:
+                        break
+                    score += other[job_id]
+                else:
+                    posted_at = self._docs[job_id][2]
+                    if since is not None and (posted_at is None or posted_at < since):
+                        continue
+                    results.append((score, job_id))
+
+        results.sort(key=lambda hit: (-hit[0], -hit[1]))
+        return results
+
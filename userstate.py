@@ -0,0 +1,111 @@
+import struct
+import threading
+import time
+from array import array
+from collections import namedtuple
+
+from sqlalchemy import select
+
+import notifications
+from models import db, User, Application, NotificationCounter
+
+# Per-user state every page needs: the role, the unread notification count and,
+# for employees, the ids of the jobs they applied to. It lives in the shared
+# cache backend (see cache.make_cache) so all workers on a host reuse it. An
+# entry is loaded on first use and then kept current by the handlers that
+# change it, instead of being re-read on each page. In a process-local
+# (memory://) cache another worker's writes can't reach it, so entries there
+# only live LOCAL_STATE_TTL seconds.
+#
+# Entries are a small header followed by the applied job ids as a sorted
+# array of unsigned 32-bit ints, about 4 bytes per application.
+
+STATE_TTL = 3600  # seconds an entry lives without being rewritten
+LOCAL_STATE_TTL = 5  # the same, in a cache other workers can't update
+UNREAD_REFRESH = 30  # seconds before the unread count is re-read, for writers outside this cache
+ROLES = ('employee', 'employer')
+_HEADER = struct.Struct('<BId')  # role, unread count, when the count was read
+
+UserState = namedtuple('UserState', 'role unread applied unread_at')
+
+
+def encode(state):
+    role = ROLES.index(state.role) if state.role in ROLES else 255
+    return (_HEADER.pack(role, state.unread, state.unread_at)
+            + array('I', sorted(state.applied)).tobytes())
+
+
+def decode(value):
+    role, unread, unread_at = _HEADER.unpack_from(value)
+    applied = array('I')
+    applied.frombytes(value[_HEADER.size:])
+    return UserState(ROLES[role] if role < len(ROLES) else None, unread, frozenset(applied), unread_at)
+
+
+class UserStateCache:
+    """Lazily loaded, write-through per-user state on top of a fragment cache backend.
+
+    Updates are read-modify-write. The lock makes them atomic within a
+    process; across processes sharing Redis, two concurrent updates for the
+    same user can lose one, which ``STATE_TTL`` bounds.
+    """
+
+    def __init__(self, cache, ttl=None, unread_refresh=UNREAD_REFRESH):
+        self.cache = cache
+        self.ttl = ttl or (STATE_TTL if cache.shared else LOCAL_STATE_TTL)
+        self.unread_refresh = unread_refresh
+        self._lock = threading.Lock()
+
+    def get(self, user_id):
+        """Return the ``UserState`` of a user, loading it on a miss."""
+        value = self.cache.get(self._key(user_id))
+        state = decode(value) if value is not None else None
+        if state is None:
+            state = self._load(user_id)
+        elif time.time() - state.unread_at > self.unread_refresh:
+            state = state._replace(unread=notifications.unread_count(user_id), unread_at=time.time())
+        else:
+            return state
+        self._store(user_id, state)
+        return state
+
+    def add_applied(self, user_id, job_id):
+        self._update(user_id, lambda state: state._replace(applied=state.applied | {job_id}))
+
+    def remove_applied(self, user_ids, job_id):
+        """Drop a deleted job from the applied sets of its applicants."""
+        for user_id in user_ids:
+            self._update(user_id, lambda state: state._replace(applied=state.applied - {job_id}))
+
+    def add_unread(self, counts):
+        """Bump cached unread counts by ``{user_id: new notifications}``."""
+        for user_id, count in counts.items():
+            self._update(user_id, lambda state: state._replace(unread=state.unread + count))
+
+    def set_unread(self, user_id, unread):
+        self._update(user_id, lambda state: state._replace(unread=unread, unread_at=time.time()))
+
+    def _update(self, user_id, change):
+        # Users without an entry are left alone; theirs is loaded fresh when needed
+        with self._lock:
+            value = self.cache.get(self._key(user_id))
+            if value is not None:
+                self._store(user_id, change(decode(value)))
+
+    def _store(self, user_id, state):
+        self.cache.set(self._key(user_id), encode(state), ttl=self.ttl)
+
+    def _load(self, user_id):
+        row = db.session.execute(select(User.role, NotificationCounter.unread)
+                                 .outerjoin(NotificationCounter, NotificationCounter.user_id == User.id)
+                                 .where(User.id == user_id)).first()
+        role, unread = row if row is not None else (None, 0)
+        applied = frozenset()
+        if role == 'employee':
+            applied = frozenset(db.session.scalars(select(Application.job_id)
+                                                   .where(Application.applicant_id == user_id)))
+        return UserState(role, unread or 0, applied, time.time())
+
+    @staticmethod
+    def _key(user_id):
+        return f"user:{user_id}"
@@ -0,0 +1,77 @@
+"""Background worker that delivers outbox events, expires and purges jobs and archives closed chat threads.
+
+Run alongside the web workers:
+
+    python worker.py [--batch-size 500] [--interval 2] [--archive-days 30] [--once]
+"""
+import argparse
+import logging
+import time
+
+from app import all_translations, app, user_state
+from models import db
+import archive
+import lifecycle
+import notifications
+
+logger = logging.getLogger("worker")
+
+PURGE_INTERVAL = 3600  # seconds between clean-ups of delivered events
+ARCHIVE_INTERVAL = 3600  # seconds between archiving passes over closed threads
+ARCHIVE_BATCH = 100  # threads per pass; a full batch means more are waiting
+EXPIRE_INTERVAL = 60  # seconds between sweeps for jobs past their closing date
+EXPIRE_BATCH = 1000  # jobs expired per transaction
+PURGE_JOBS = 10  # deleted jobs purged per pass
+
+
+def run(batch_size=500, interval=2.0, once=False, archive_days=archive.INACTIVE_DAYS):
+    """Drain the outbox until it is empty, then poll every ``interval`` seconds."""
+    purged_at = archived_at = expired_at = 0.0
+    with app.app_context():
+        while True:
+            try:
+                # Decisions reach the applicants' cached unread badges when USER_STATE_CACHE_URL is shared
+                processed = notifications.drain_outbox(all_translations(), batch_size, on_notified=user_state.add_unread)
+                if time.monotonic() - purged_at > PURGE_INTERVAL:
+                    notifications.purge_processed()
+                    purged_at = time.monotonic()
+                if time.monotonic() - expired_at > EXPIRE_INTERVAL:
+                    expired = lifecycle.expire_due_jobs(EXPIRE_BATCH)
+                    if expired:
+                        logger.info("Expired %d jobs", expired)
+                    if expired < EXPIRE_BATCH:
+                        expired_at = time.monotonic()
+                jobs, applications = lifecycle.purge_deleted_jobs(PURGE_JOBS)
+                if jobs:
+                    logger.info("Purged %d deleted jobs with %d applications", jobs, applications)
+                if time.monotonic() - archived_at > ARCHIVE_INTERVAL:
+                    threads, messages = archive.archive_closed_threads(archive_days, ARCHIVE_BATCH)
+                    if threads:
+                        logger.info("Archived %d messages from %d closed threads", messages, threads)
+                    if threads < ARCHIVE_BATCH:
+                        archived_at = time.monotonic()
+            except Exception:
+                db.session.rollback()
+                logger.exception("Outbox batch failed; retrying")
+                processed = 0
+            finally:
+                db.session.remove()
+
+            if processed:
+                logger.info("Delivered %d outbox events", processed)
+            if once and processed < batch_size:
+                return
+            if processed < batch_size:
+                time.sleep(interval)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--interval", type=float, default=2.0, help="seconds to sleep when the outbox is empty")
+    parser.add_argument("--archive-days", type=int, default=archive.INACTIVE_DAYS,
+                        help="archive closed chat threads idle for this many days")
+    parser.add_argument("--once", action="store_true", help="exit once the outbox is drained")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(levelname)s %(message)s")
+    run(args.batch_size, args.interval, args.once, args.archive_days)